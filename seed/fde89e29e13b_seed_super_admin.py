@@ -5,15 +5,11 @@ Revises: 6708ab30a4cc
 Create Date: 2025-03-20 21:08:16.692869
 
 """
-from uuid import uuid4
 from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
 
-from bookstore.auth.utils import get_password_hash
-from bookstore.config import config
-
 
 # revision identifiers, used by Alembic.
 revision: str = 'fde89e29e13b'
@@ -23,26 +19,29 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
+    # Imported here so other alembic commands don't load settings or the
+    # password hasher just to read this revision's metadata.
+    from bookstore.auth.utils import get_password_hash
+    from bookstore.config import config
+
     conn = op.get_bind()
     result = conn.execute(
         sa.text("SELECT id FROM users WHERE role='admin' LIMIT 1")
     ).fetchone()
 
     if not result:
-        admin_id = uuid4()
         hashed_password = get_password_hash(config.ADMIN_PASSWORD.get_secret_value())
-        conn.execute(
+        admin_id = conn.execute(
             sa.text(
-                "INSERT INTO users (id, email, hashed_password, role, is_active, is_superuser) VALUES (:admin_id, :email, :hashed_password, :role, :is_active, :is_superuser)"
+                "INSERT INTO users (email, hashed_password, role, is_active, is_superuser) VALUES (:email, :hashed_password, :role, :is_active, :is_superuser) RETURNING id"
             ).bindparams(
-                admin_id=admin_id,
                 email=config.ADMIN_EMAIL,
                 hashed_password=hashed_password,
                 role="admin",
                 is_active=True,
                 is_superuser=True,
             )
-        )
+        ).scalar_one()
         print(f"Super admin created {config.ADMIN_EMAIL} with ID: ", admin_id)
 
 
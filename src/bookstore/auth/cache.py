@@ -0,0 +1,48 @@
+import time
+import hashlib
+
+from uuid import UUID
+from typing import Tuple
+
+from cachetools import TLRUCache, TTLCache
+
+from .models import User
+from .utils import ACCESS_TOKEN_EXPIRE_SECONDS
+
+
+CREDENTIAL_CACHE_TTL = 30
+
+
+def credential_cache_key(credential: str) -> bytes:
+    # Keyed on a digest so raw tokens and API keys are never held in memory.
+    return hashlib.sha256(credential.encode()).digest()
+
+
+def _token_cache_ttu(key: bytes, value: Tuple[float, User], now: float) -> float:
+    expires_at, _ = value
+    return now + min(CREDENTIAL_CACHE_TTL, expires_at - time.time())
+
+
+# Decoded bearer tokens and their users, detached from the loading session, held until the earlier of
+# CREDENTIAL_CACHE_TTL seconds or the token's own expiry.
+token_cache: TLRUCache[bytes, Tuple[float, User]] = TLRUCache(maxsize=50_000, ttu=_token_cache_ttu)
+
+# Users resolved from API keys, keyed by the key's HMAC digest. Keys do not
+# expire, so a plain TTL applies.
+api_key_cache: TTLCache[bytes, User] = TTLCache(maxsize=10_000, ttl=CREDENTIAL_CACHE_TTL)
+
+# Logged-out tokens, kept until they would have expired anyway. This is a
+# per-process, size-bounded best effort: other workers never see a revocation,
+# and once maxsize is reached the oldest entries are evicted early, which
+# makes those tokens valid again until their own expiry.
+revoked_tokens: TTLCache[bytes, bool] = TTLCache(maxsize=100_000, ttl=ACCESS_TOKEN_EXPIRE_SECONDS)
+
+
+def invalidate_user(user_id: UUID) -> None:
+    """Drop every cached credential that resolves to the given user."""
+    for key, (_, user) in list(token_cache.items()):
+        if user.id == user_id:
+            token_cache.pop(key, None)
+    for key, user in list(api_key_cache.items()):
+        if user.id == user_id:
+            api_key_cache.pop(key, None)
@@ -1,7 +1,6 @@
-from typing import Annotated, Optional
+from typing import Annotated, Awaitable, Callable, Optional
 
-from click import Option
-from fastapi import Depends, HTTPException, Security, status
+from fastapi import Depends, HTTPException, Request, Security, status
 from fastapi.security import OAuth2PasswordBearer, APIKeyHeader
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,11 +11,12 @@ from bookstore.database.session import get_session
 from .models import User, UserRole
 from .repositories import UserRepository,APIKeyRepository
 from .services import AuthService
+from .tasks import last_used_batcher
 
 
 logger = get_logger("auth.dependencies")
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{config.API_V1_STR}/auth/token")
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{config.API_V1_STR}/auth/token", auto_error=False)
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
@@ -27,73 +27,47 @@ async def get_auth_service(session: AsyncSession = Depends(get_session)) -> Auth
 
 
 async def get_current_user(
+    request: Request,
     token: Annotated[Optional[str], Security(oauth2_scheme)],
     api_key: Annotated[Optional[str], Security(api_key_header)],
-    auth_service: AuthService = Depends(get_auth_service),
+    session: AsyncSession = Depends(get_session),
 ) -> User:
-    logger.debug("Getting current user")
-    logger.debug(f"API key: {api_key}")
-    logger.debug(f"Token: {token}")
-    if api_key:
-        return await auth_service.validate_api_key(api_key)
-    elif token:
-        return await auth_service.validate_token(token)
-    else:
+    if not api_key and not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer or API Key"},
         )
-    
 
-def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
-    logger.info(current_user)
-    if not current_user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
+    auth_service = AuthService(UserRepository(session), APIKeyRepository(session))
+    if not api_key:
+        return await auth_service.validate_token(token)
 
+    user, api_key_hash = await auth_service.validate_api_key(api_key)
 
-def user_is_admin(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
-    if current_user.role != UserRole.ADMIN:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
-        )
-    return current_user
+    client_ip = request.client.host if request.client else None
+    last_used_batcher.touch(api_key_hash, client_ip)
+    return user
 
 
-def user_is_librarian(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
-    if current_user.role != UserRole.LIBRARIAN:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
-        )
-    return current_user
+def require_role(*roles: UserRole) -> Callable[..., Awaitable[User]]:
+    allowed_roles = frozenset(roles)
 
+    async def dependency(current_user: User = Depends(get_current_user)) -> User:
+        if not current_user.is_active:
+            raise HTTPException(status_code=400, detail="Inactive user")
+        if allowed_roles and current_user.role not in allowed_roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions",
+            )
+        return current_user
 
-def user_is_librarian_or_admin(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
-    if current_user.role not in [UserRole.LIBRARIAN, UserRole.ADMIN]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
-        )
-    return current_user
+    return dependency
 
 
-def user_is_reader(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
-    if current_user.role != UserRole.READER:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
-        )
-    return current_user
+get_current_active_user = require_role()
+user_is_admin = require_role(UserRole.ADMIN)
+user_is_librarian = require_role(UserRole.LIBRARIAN)
+user_is_librarian_or_admin = require_role(UserRole.LIBRARIAN, UserRole.ADMIN)
+user_is_reader = require_role(UserRole.READER)
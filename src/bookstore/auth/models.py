@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, List
 
 from sqlalchemy.orm import mapped_column, Mapped, relationship
-from sqlalchemy import String, Boolean, ForeignKey, TIMESTAMP, UniqueConstraint
+from sqlalchemy import String, Boolean, ForeignKey, LargeBinary, TIMESTAMP, UniqueConstraint
 from bookstore.database.models import Base, TimeStampMixin, UUIDMixin
 
 
@@ -13,6 +13,17 @@ class UserRole(Enum):
     LIBRARIAN = "librarian"
     READER = "reader"
 
+    @property
+    def rank(self) -> int:
+        return ROLE_RANK[self]
+
+
+ROLE_RANK = {
+    UserRole.READER: 0,
+    UserRole.LIBRARIAN: 1,
+    UserRole.ADMIN: 2,
+}
+
 
 class User(Base, UUIDMixin, TimeStampMixin):
     __tablename__ = "users"
@@ -34,7 +45,7 @@ class APIKey(Base, UUIDMixin, TimeStampMixin):
     __tablename__ = "api_keys"
 
     user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
-    api_key_hash: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
+    api_key_hash: Mapped[bytes] = mapped_column(LargeBinary(32), unique=True, index=True, nullable=False)
     name: Mapped[str] = mapped_column(String, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     last_used_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
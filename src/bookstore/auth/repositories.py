@@ -1,61 +1,102 @@
 from uuid import UUID
-from datetime import datetime, timezone
-from typing import Optional, List
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, update, delete
+from sqlalchemy import TIMESTAMP, bindparam, case, exists, insert, literal, select, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, selectinload
 
 from .models import User, APIKey
-from .utils import get_password_hash, generate_api_key, hash_api_key
+from .utils import generate_api_key, hash_api_key
 from .schemas import UserCreate, UserUpdate, APIKeyCreate
 
 
+SELECT_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+SELECT_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+SELECT_USER_WITH_API_KEYS_BY_ID = SELECT_USER_BY_ID.options(selectinload(User.api_keys))
+SELECT_API_KEY_BY_ID = select(APIKey).where(APIKey.id == bindparam("api_key_id"))
+SELECT_API_KEY_BY_HASH = select(APIKey).where(APIKey.api_key_hash == bindparam("api_key_hash"))
+SELECT_ACTIVE_API_KEY_WITH_USER = (
+    select(APIKey)
+    .join(APIKey.user)
+    .options(contains_eager(APIKey.user))
+    .where(
+        APIKey.api_key_hash == bindparam("api_key_hash"),
+        APIKey.is_active.is_(True),
+        User.is_active.is_(True),
+    )
+)
+
+
 class UserRepository:
+    __slots__ = ("session",)
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_all_users(self, skip: int = 0, limit: int = 100) -> List[User]:
-        result = await self.session.execute(select(User).offset(skip).limit(limit))
-        return result.scalars()._allrows()
+    async def stream_all_users(self, skip: int = 0, limit: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        result = await self.session.stream(
+            select(User.id, User.email, User.role, User.is_active, User.created_at, User.updated_at)
+            .offset(skip)
+            .limit(limit)
+        )
+        async for row in result.mappings():
+            yield dict(row)
+
+    def detach(self, user: User) -> None:
+        # Detached users keep their loaded columns and are unaffected by this
+        # session's later commit or rollback, so they can outlive the request.
+        self.session.expunge(user)
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
-        result = await self.session.execute(select(User).where(User.email == email))
-        return result.scalars().first()
+        result = await self.session.execute(SELECT_USER_BY_EMAIL, {"email": email})
+        return result.scalar_one_or_none()
     
-    async def get_user_by_id(self, user_id: UUID) -> Optional[User]:
-        result = await self.session.execute(select(User).where(User.id == user_id))
-        return result.scalars().first()
+    async def get_user_by_id(self, user_id: UUID, include_keys: bool = False) -> Optional[User]:
+        if not include_keys:
+            # Served from the identity map when the user was already loaded in this session.
+            return await self.session.get(User, user_id)
+        result = await self.session.execute(SELECT_USER_WITH_API_KEYS_BY_ID, {"user_id": user_id})
+        return result.scalar_one_or_none()
 
     async def user_exists(self, email: str) -> bool:
-        user = await self.get_user_by_email(email)
-        return user is not None
-
-    async def create_user(self, user: UserCreate) -> User:
-        if not self.user_exists(user.email):
+        return bool(await self.session.scalar(select(exists().where(User.email == email))))
+
+    async def create_user(self, user: UserCreate, hashed_password: str) -> User:
+        result = await self.session.execute(
+            pg_insert(User)
+            .values(
+                email=user.email,
+                hashed_password=hashed_password,
+                role=user.role,
+                is_active=user.is_active,
+            )
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
+        )
+        db_user = result.scalar_one_or_none()
+        if db_user is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
             )
-        
-        hashed_password = get_password_hash(user.password.get_secret_value())
-        db_user = User(
-            email=user.email,
-            hashed_password=hashed_password,
-            role=user.role,
-            is_active=user.is_active,
-        )
-        
-        self.session.add(db_user)
+
         await self.session.commit()
-        await self.session.refresh(db_user)
         return db_user
     
-    async def update_user(self, user_id: UUID, user_update: UserUpdate) -> User:
-        update_data = user_update.model_dump(exclude_unset=True)
+    async def update_user(
+        self,
+        user_id: UUID,
+        user_update: UserUpdate,
+        hashed_password: Optional[str] = None,
+    ) -> User:
+        update_data = user_update.model_dump(exclude_unset=True, exclude={"password"})
 
         if update_data.get("email"):
-            if self.user_exists(update_data["email"]):
+            existing = await self.get_user_by_email(update_data["email"])
+            if existing and existing.id != user_id:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Email already registered",
@@ -68,9 +109,8 @@ class UserRepository:
                 detail="User not found",
             )
         
-        if "password" in update_data:
-            password = update_data.pop("password")
-            update_data["hashed_password"] = get_password_hash(password)
+        if hashed_password is not None:
+            update_data["hashed_password"] = hashed_password
 
         await self.session.execute(
             update(User).where(User.id == user_id).values(**update_data)
@@ -80,6 +120,12 @@ class UserRepository:
         await self.session.refresh(db_user)
         return db_user
     
+    async def update_password_hash(self, user_id: UUID, hashed_password: str) -> None:
+        await self.session.execute(
+            update(User).where(User.id == user_id).values(hashed_password=hashed_password)
+        )
+        await self.session.commit()
+
     async def delete_user(self, user_id: UUID) -> bool:
         db_user = await self.get_user_by_id(user_id)
         if not db_user:
@@ -93,40 +139,48 @@ class UserRepository:
 
 
 class APIKeyRepository:
+    __slots__ = ("session",)
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def create_api_key(self, user_id: UUID, api_key_create: APIKeyCreate) -> tuple[APIKey, str]:
-        api_key_name = api_key_create.name
-        existing = await self.get_by_name(api_key_name)
-        if existing:
+        if await self.name_exists(user_id, api_key_create.name):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="API key already exists",
             )
         raw_key = generate_api_key()
         hashed_key = hash_api_key(raw_key)
-        api_key = APIKey(user_id=user_id, api_key_hash=hashed_key, **api_key_create.model_dump())
-        self.session.add(api_key)
+        result = await self.session.execute(
+            insert(APIKey)
+            .values(user_id=user_id, api_key_hash=hashed_key, **api_key_create.model_dump())
+            .returning(APIKey)
+        )
+        api_key = result.scalar_one()
         await self.session.commit()
-        await self.session.refresh(api_key)
         return api_key, raw_key
 
+    async def name_exists(self, user_id: UUID, api_key_name: str) -> bool:
+        return bool(await self.session.scalar(
+            select(exists().where(APIKey.user_id == user_id, APIKey.name == api_key_name))
+        ))
+
     async def get_by_name(self, api_key_name: str) -> Optional[APIKey]:
         result = await self.session.execute(select(APIKey).where(APIKey.name == api_key_name))
         return result.scalars().first()
     
     async def get_by_id(self, api_key_id: UUID) -> Optional[APIKey]:
-        result = await self.session.execute(select(APIKey).where(APIKey.id == api_key_id))
-        return result.scalars().first()
+        result = await self.session.execute(SELECT_API_KEY_BY_ID, {"api_key_id": api_key_id})
+        return result.scalar_one_or_none()
     
-    async def get_by_hash(self, api_key_hash: str) -> Optional[APIKey]:
-        result = await self.session.execute(select(APIKey).where(APIKey.api_key_hash == api_key_hash))
-        return result.scalars().first()
+    async def get_by_hash(self, api_key_hash: bytes) -> Optional[APIKey]:
+        result = await self.session.execute(SELECT_API_KEY_BY_HASH, {"api_key_hash": api_key_hash})
+        return result.scalar_one_or_none()
     
     async def get_for_user(self, user_id: UUID) -> List[APIKey]:
         result = await self.session.execute(select(APIKey).where(APIKey.user_id == user_id))
-        return result.scalars()._allrows()
+        return result.scalars().all()
     
     async def delete(self, api_key_id: UUID) -> bool:
         api_key = await self.get_by_id(api_key_id)
@@ -139,30 +193,29 @@ class APIKeyRepository:
         await self.session.commit()
         return True
     
-    async def update_last_used(self, api_key_id: UUID) -> bool:
-        api_key = await self.get_by_id(api_key_id)
-        if not api_key:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="API key not found",
-            )
-        api_key.last_used_at = datetime.now(timezone.utc)
-        await self.session.commit()
-        return True
-
-    async def verify_api_key(self, raw_key: str) -> Optional[APIKey]:
-        if not raw_key:
-            return None
-        
-        hashed_key = hash_api_key(raw_key)
-        result = await self.session.execute(select(APIKey).where(
-                APIKey.api_key_hash == hashed_key,
-                APIKey.is_active
-            )
+    async def update_last_used(self, usage: Dict[bytes, Tuple[datetime, Optional[str]]]) -> int:
+        if not usage:
+            return 0
+        last_used_at = case(
+            {
+                api_key_hash: literal(used_at, TIMESTAMP(timezone=True))
+                for api_key_hash, (used_at, _) in usage.items()
+            },
+            value=APIKey.api_key_hash,
         )
-        api_key = result.scalars().first()
+        last_used_ip = case(
+            {api_key_hash: ip for api_key_hash, (_, ip) in usage.items()},
+            value=APIKey.api_key_hash,
+        )
+        result = await self.session.execute(
+            update(APIKey)
+            .where(APIKey.api_key_hash.in_(usage))
+            .values(last_used_at=last_used_at, last_used_ip=last_used_ip)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
 
-        if not api_key:
-            return None
-        
-        return api_key
\ No newline at end of file
+    async def get_active_by_hash(self, api_key_hash: bytes) -> Optional[APIKey]:
+        result = await self.session.execute(SELECT_ACTIVE_API_KEY_WITH_USER, {"api_key_hash": api_key_hash})
+        return result.scalar_one_or_none()
\ No newline at end of file
@@ -1,14 +1,27 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 
 from bookstore.logger import get_logger
 
 from .models import User, UserRole
-from .schemas import UserCreate, UserUpdate, UserResponse, LoginResponse, APIKeyCreate, APIKeyFullResponse, Token
-from .services import AuthService
+from .schemas import (
+    UserCreate,
+    UserUpdate,
+    UserResponse,
+    UserDetails,
+    LoginResponse,
+    APIKeyCreate,
+    APIKeyResponse,
+    APIKeyFullResponse,
+    Token,
+    APIKEY_LIST_ADAPTER,
+)
+from .services import AuthService, stream_users_json
 from .dependencies import (
+    oauth2_scheme,
     get_auth_service,
     get_current_active_user,
     user_is_admin,
@@ -26,9 +39,7 @@ async def create_user(
     auth_service: AuthService = Depends(get_auth_service),
     current_user: User = Depends(user_is_librarian_or_admin),
 ):
-    if not current_user.role == UserRole.ADMIN:
-        pass
-    elif current_user.role == UserRole.LIBRARIAN and user.role != UserRole.READER:
+    if current_user.role.rank < UserRole.ADMIN.rank and user.role.rank > UserRole.READER.rank:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
 
     response = await auth_service.create_user(user)
@@ -56,21 +67,28 @@ async def login_for_access_token(
     return response.token
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    auth_service: AuthService = Depends(get_auth_service),
+    current_user: User = Depends(get_current_active_user),
+):
+    if token:
+        await auth_service.revoke_token(token)
+
+
 @router.get("/me", response_model=UserResponse, status_code=status.HTTP_200_OK)
 async def get_current_user(current_user: User = Depends(get_current_active_user)):
-    logger.info(current_user)
-    return UserResponse.model_validate(current_user)
+    return UserResponse.from_user(current_user)
 
 
 @router.get("/users", response_model=list[UserResponse], status_code=status.HTTP_200_OK)
 async def get_all_users(
     skip: int = 0,
     limit: int = 100,
-    auth_service: AuthService = Depends(get_auth_service),
     current_user: User = Depends(user_is_admin),
 ):
-    response = await auth_service.get_all_users(skip, limit)
-    return response
+    return StreamingResponse(stream_users_json(skip, limit), media_type="application/json")
 
 
 @router.get("/users/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
@@ -83,6 +101,16 @@ async def get_user_by_id(
     return response
 
 
+@router.get("/users/{user_id}/details", response_model=UserDetails, status_code=status.HTTP_200_OK)
+async def get_user_details(
+    user_id: UUID,
+    auth_service: AuthService = Depends(get_auth_service),
+    current_user: User = Depends(user_is_librarian_or_admin),
+):
+    response = await auth_service.get_user_by_id(user_id, include_keys=True)
+    return response
+
+
 @router.put("/users/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
 async def update_user(
     user_id: UUID,
@@ -104,7 +132,7 @@ async def update_user(
         )
 
     if target_user.role and current_user.role != UserRole.ADMIN:
-        if target_user.role.value > current_user.role.value:
+        if target_user.role.rank > current_user.role.rank:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions",
@@ -143,13 +171,13 @@ async def create_api_key(
     return response
 
 
-@router.get("/api-keys", response_model=list[APIKeyFullResponse], status_code=status.HTTP_200_OK)
+@router.get("/api-keys", response_model=list[APIKeyResponse], status_code=status.HTTP_200_OK)
 async def get_api_keys(
     auth_service: AuthService = Depends(get_auth_service),
     current_user: User = Depends(get_current_active_user),
 ):
-    response = await auth_service.get_api_keys(current_user.id)
-    return response
+    api_keys = await auth_service.get_api_keys(current_user.id)
+    return Response(content=APIKEY_LIST_ADAPTER.dump_json(api_keys), media_type="application/json")
 
 
 @router.delete("/users/{user-id}/api-keys/{api-key-id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -2,7 +2,7 @@ from uuid import UUID
 from typing import Optional, Annotated
 from datetime import datetime
 
-from pydantic import BaseModel, EmailStr, Field, SecretStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, SecretStr, TypeAdapter
 
 from .models import UserRole
 
@@ -16,8 +16,8 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: Annotated[SecretStr, Field(min_length=8)]
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "email": "user@example.com",
                 "role": "reader",
@@ -25,6 +25,7 @@ class UserCreate(UserBase):
                 "password": "password123",
             }
         }
+    )
 
 
 class UserUpdate(BaseModel):
@@ -39,13 +40,23 @@ class UserinDB(UserBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-        json_encoders = {UUID: str}
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserResponse(UserinDB):
-    pass
+    model_config = ConfigDict(frozen=True)
+
+    @classmethod
+    def from_user(cls, user) -> "UserResponse":
+        # Built without validation: the fields come straight from a loaded User row.
+        return cls.model_construct(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
 
 class UserDetails(UserResponse):
     api_keys: list["APIKeyResponse"] = []
@@ -62,14 +73,11 @@ class APIKeyResponse(APIKeyBase):
     id: UUID
     user_id: UUID
     is_active: bool
-    api_key_hash: str
     created_at: datetime
     updated_at: datetime
     last_used_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-        json_encoders = {UUID: str}
+    model_config = ConfigDict(from_attributes=True)
 
 class APIKeyFullResponse(APIKeyResponse):
     key: str
@@ -77,20 +85,20 @@ class APIKeyFullResponse(APIKeyResponse):
 class APIKeyinDB(APIKeyBase):
     id: UUID    
     user_id: UUID
-    api_key_hash: str
+    api_key_hash: bytes
     is_active: bool
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-        json_encoders = {UUID: str}
+    model_config = ConfigDict(from_attributes=True)
 
 
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
 
+    model_config = ConfigDict(frozen=True)
+
 
 class TokenPayload(BaseModel):
     user_id: UUID
@@ -105,7 +113,14 @@ class LoginResponse(BaseModel):
     user: UserResponse
     token: Token
 
+    model_config = ConfigDict(frozen=True)
+
 
 class ChangePasswordRequest(BaseModel):
     current_password: str
-    new_password: str = Field(..., min_length=8)
\ No newline at end of file
+    new_password: str = Field(..., min_length=8)
+
+
+UserDetails.model_rebuild()
+
+APIKEY_LIST_ADAPTER = TypeAdapter(list[APIKeyResponse])
@@ -1,26 +1,60 @@
 from uuid import UUID
-from typing import List
+from typing import AsyncIterator, List, Tuple
 
-from jose import JWTError
+import orjson
+
+from jwt import InvalidTokenError
 from fastapi import Depends, HTTPException, status
 
 from .utils import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
+    password_needs_rehash,
     create_access_token,
     decode_token,
+    hash_api_key,
+    looks_like_api_key,
+    DUMMY_PASSWORD_HASH,
 )
 
 from bookstore.logger import get_logger
+from bookstore.database.session import async_session_maker
 
+from .cache import api_key_cache, credential_cache_key, invalidate_user, revoked_tokens, token_cache
 from .models import User, UserRole
 from .repositories import UserRepository, APIKeyRepository
-from .schemas import UserCreate, UserUpdate, UserResponse,TokenPayload, Token, APIKeyCreate, APIKeyFullResponse, LoginResponse
+from .schemas import (
+    UserCreate,
+    UserUpdate,
+    UserResponse,
+    TokenPayload,
+    Token,
+    APIKeyCreate,
+    APIKeyResponse,
+    APIKeyFullResponse,
+    LoginResponse,
+    APIKEY_LIST_ADAPTER,
+)
 
 
 logger = get_logger("auth.services")
 
+async def stream_users_json(skip: int = 0, limit: int = 100) -> AsyncIterator[bytes]:
+    # Runs on its own session so the server-side cursor stays open for the
+    # whole response instead of being tied to the request's session.
+    async with async_session_maker() as session:
+        yield b"["
+        separator = b""
+        async for user in UserRepository(session).stream_all_users(skip, limit):
+            # asyncpg returns its own UUID type, which orjson does not serialize.
+            yield separator + orjson.dumps(user, default=str)
+            separator = b","
+        yield b"]"
+
+
 class AuthService:
+    __slots__ = ("user_repository", "api_key_repository")
+
     def __init__(
             self,
             user_repository: UserRepository = Depends(),
@@ -30,12 +64,17 @@ class AuthService:
         self.api_key_repository = api_key_repository
 
     async def create_user(self, user: UserCreate) -> UserResponse:
-        db_user = await self.user_repository.create_user(user)
-        return UserResponse.model_validate(db_user)
+        hashed_password = await get_password_hash_async(user.password.get_secret_value())
+        db_user = await self.user_repository.create_user(user, hashed_password=hashed_password)
+        return UserResponse.from_user(db_user)
     
     async def update_user(self, user_id: UUID, user: UserUpdate) -> UserResponse:
-        db_user = await self.user_repository.update_user(user_id, user)
-        return UserResponse.model_validate(db_user)
+        hashed_password = None
+        if user.password:
+            hashed_password = await get_password_hash_async(user.password)
+        db_user = await self.user_repository.update_user(user_id, user, hashed_password=hashed_password)
+        invalidate_user(user_id)
+        return UserResponse.from_user(db_user)
     
     async def delete_user(self, user_id: UUID) -> bool:
         result = await self.user_repository.delete_user(user_id)
@@ -44,6 +83,7 @@ class AuthService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found",
             )
+        invalidate_user(user_id)
         return True
 
     async def get_user_by_email(self, email: str) -> User:
@@ -55,8 +95,8 @@ class AuthService:
             )
         return db_user
     
-    async def get_user_by_id(self, user_id: UUID) -> User:
-        db_user = await self.user_repository.get_user_by_id(user_id)
+    async def get_user_by_id(self, user_id: UUID, include_keys: bool = False) -> User:
+        db_user = await self.user_repository.get_user_by_id(user_id, include_keys=include_keys)
         if not db_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -64,13 +104,12 @@ class AuthService:
             )
         return db_user
     
-    async def get_all_users(self, skip: int = 0, limit: int = 100) -> List[UserResponse]:
-        users = await self.user_repository.get_all_users(skip, limit)
-        return [UserResponse.model_validate(user) for user in users]
-
     async def authenticate_user(self, email: str, password: str) -> LoginResponse:
-        user = await self.get_user_by_email(email)
-        if not user or verify_password(password, user.hashed_password) is False:
+        user = await self.user_repository.get_user_by_email(email)
+        # Unknown emails still pay for a hash check so response timing does
+        # not reveal which accounts exist.
+        hashed_password = user.hashed_password if user else DUMMY_PASSWORD_HASH
+        if not await verify_password_async(password, hashed_password) or not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
@@ -83,43 +122,59 @@ class AuthService:
                 detail="User is not active",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+
+        if password_needs_rehash(user.hashed_password):
+            hashed_password = await get_password_hash_async(password)
+            await self.user_repository.update_password_hash(user.id, hashed_password)
         
         access_token = await self.create_access_token(user.id)
-        return LoginResponse(
-            user=UserResponse.model_validate(user),
-            token=Token(access_token=access_token, token_type="bearer")
+        return LoginResponse.model_construct(
+            user=UserResponse.from_user(user),
+            token=Token.model_construct(access_token=access_token, token_type="bearer"),
         )
 
     async def change_password(self, user_id: UUID, old_password: str, new_password: str) -> UserResponse:
         user = await self.get_user_by_id(user_id)
-        if not user or verify_password(old_password, user.hashed_password) is False:
+        if not user or await verify_password_async(old_password, user.hashed_password) is False:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
             )
-        hashed_password = get_password_hash(new_password)
-        user_update = UserUpdate(password=hashed_password)
-        await self.user_repository.update_user(user_id, user_update)
-        return UserResponse.model_validate(user)
+        hashed_password = await get_password_hash_async(new_password)
+        await self.user_repository.update_password_hash(user_id, hashed_password)
+        invalidate_user(user_id)
+        return UserResponse.from_user(user)
     
     async def create_access_token(self, user_id: UUID) -> str:
-        payload = TokenPayload(user_id=user_id)
+        payload = TokenPayload.model_construct(user_id=user_id)
         return create_access_token(payload)
     
     async def validate_token(self, token: str) -> User:
+        cache_key = credential_cache_key(token)
+        if cache_key in revoked_tokens:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        cached = token_cache.get(cache_key)
+        if cached is not None:
+            return cached[1]
+
         try:
-            logger.info("Validating token")
             payload = decode_token(token)
-            user_id = payload.get("sub")
+            subject = payload.get("sub")
 
-            if user_id is None:
+            if subject is None:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid token",
                     headers={"WWW-Authenticate": "Bearer"},
                 )
+            user_id = UUID(subject)
             
-        except JWTError:
+        except (InvalidTokenError, ValueError):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Could not validate credentials",
@@ -140,8 +195,14 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        self.user_repository.detach(user)
+        token_cache[cache_key] = (payload["exp"], user)
         return user
-        
+
+    async def revoke_token(self, token: str) -> None:
+        cache_key = credential_cache_key(token)
+        revoked_tokens[cache_key] = True
+        token_cache.pop(cache_key, None)
 
     async def create_api_key(self, user_id: UUID, api_key_data: APIKeyCreate) -> APIKeyFullResponse:
         user = await self.get_user_by_id(user_id)
@@ -156,7 +217,6 @@ class AuthService:
             id=api_key.id,
             user_id=api_key.user_id,
             name=api_key.name,
-            api_key_hash=api_key.api_key_hash,
             is_active=api_key.is_active,
             created_at=api_key.created_at,
             updated_at=api_key.updated_at,
@@ -166,41 +226,52 @@ class AuthService:
 
         return api_key_response
     
-    async def get_api_keys(self, user_id: UUID) -> List[APIKeyFullResponse]:
+    async def get_api_keys(self, user_id: UUID) -> List[APIKeyResponse]:
         api_keys = await self.api_key_repository.get_for_user(user_id)
-        return api_keys
+        return APIKEY_LIST_ADAPTER.validate_python(api_keys, from_attributes=True)
     
-    async def validate_api_key(self, raw_key: str) -> User:
+    async def validate_api_key(self, raw_key: str) -> Tuple[User, bytes]:
+        # Returns the digest too so callers can reuse it instead of re-hashing.
         if not raw_key:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="API key is required",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        
-        api_key = await self.api_key_repository.verify_api_key(raw_key)
 
-        if not api_key:
+        if not looks_like_api_key(raw_key):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid or expired API key",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        user = await self.get_user_by_id(api_key.user_id)
-        if not user or not user.is_active:
+
+        api_key_hash = hash_api_key(raw_key)
+        user = api_key_cache.get(api_key_hash)
+        if user is not None:
+            return user, api_key_hash
+
+        api_key = await self.api_key_repository.get_active_by_hash(api_key_hash)
+
+        if not api_key:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not active or not found",
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired API key",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        
-        return user
+
+        user = api_key.user
+        self.user_repository.detach(user)
+        api_key_cache[api_key_hash] = user
+        return user, api_key_hash
     
     async def delete_api_key(self, api_key_id: UUID) -> bool:
-        result = await self.api_key_repository.delete(api_key_id)
-        if not result:
+        api_key = await self.api_key_repository.get_by_id(api_key_id)
+        if not api_key:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="API key not found",
             )
-        return True
\ No newline at end of file
+        await self.api_key_repository.delete(api_key_id)
+        invalidate_user(api_key.user_id)
+        return True
@@ -0,0 +1,57 @@
+import asyncio
+
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from bookstore.logger import get_logger
+from bookstore.database.session import async_session_maker
+
+from .repositories import APIKeyRepository
+
+
+logger = get_logger("auth.tasks")
+
+
+class LastUsedBatcher:
+    """Collects API key usage in memory and writes it out periodically.
+
+    Requests only record the usage, so the authentication path never waits
+    on a write. Repeated uses of the same key between flushes collapse into
+    a single row update.
+    """
+
+    def __init__(self, interval: float = 5.0) -> None:
+        self.interval = interval
+        self._pending: Dict[bytes, Tuple[datetime, Optional[str]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, api_key_hash: bytes, ip: Optional[str] = None) -> None:
+        self._pending[api_key_hash] = (datetime.now(timezone.utc), ip)
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        async with async_session_maker() as session:
+            await APIKeyRepository(session).update_last_used(pending)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush API key usage")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+last_used_batcher = LastUsedBatcher()
@@ -1,10 +1,18 @@
+import os
+import time
+import hmac
+import hashlib
+import secrets
+import anyio
 import bcrypt
+import jwt
 
 from typing import Optional, Dict, Any
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from argon2 import PasswordHasher
+from jwt.algorithms import get_default_algorithms
+from argon2.exceptions import InvalidHashError, VerificationError
 from fastapi import HTTPException, status
 
 from bookstore.auth.schemas import TokenPayload
@@ -13,35 +21,89 @@ from bookstore.config import config
 SECRET_KEY = config.auth.JWT_SECRET_KEY.get_secret_value()
 ALGORITHM = config.auth.JWT_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = config.auth.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
+ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+API_KEY_PEPPER = config.auth.API_KEY_PEPPER.get_secret_value().encode()
+API_KEY_PREFIX = "bk_"
 
+# Keys are parsed once here so signing and verifying never re-read PEM data.
+# For asymmetric algorithms (e.g. EdDSA) JWT_SECRET_KEY holds the private key
+# and JWT_PUBLIC_KEY the public one; the latter is derived when omitted.
+_jwt_algorithm = get_default_algorithms()[ALGORITHM]
+SIGNING_KEY = _jwt_algorithm.prepare_key(SECRET_KEY)
+if config.auth.JWT_PUBLIC_KEY:
+    VERIFYING_KEY = _jwt_algorithm.prepare_key(config.auth.JWT_PUBLIC_KEY)
+elif hasattr(SIGNING_KEY, "public_key"):
+    VERIFYING_KEY = SIGNING_KEY.public_key()
+else:
+    VERIFYING_KEY = SIGNING_KEY
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+password_hasher = PasswordHasher(
+    time_cost=config.auth.PASSWORD_HASH_TIME_COST,
+    memory_cost=config.auth.PASSWORD_HASH_MEMORY_COST,
+    parallelism=config.auth.PASSWORD_HASH_PARALLELISM,
+)
+
+
+# Verified against when a login names an unknown account, so the miss path
+# costs the same as a wrong password.
+DUMMY_PASSWORD_HASH = password_hasher.hash(secrets.token_urlsafe(16))
+
+
+def is_legacy_password_hash(hashed_password: str) -> bool:
+    return hashed_password.startswith("$2")
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    if is_legacy_password_hash(hashed_password):
+        # bcrypt only reads the first 72 bytes; passlib truncated the same way.
+        try:
+            return bcrypt.checkpw(plain_password.encode()[:72], hashed_password.encode())
+        except ValueError:
+            return False
+    try:
+        return password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
 
 
-def create_access_token(subject: TokenPayload, expires_delta: Optional[timedelta] = None) -> str:
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+def password_needs_rehash(hashed_password: str) -> bool:
+    if is_legacy_password_hash(hashed_password):
+        return True
+    return password_hasher.check_needs_rehash(hashed_password)
+
+
+# argon2-cffi and bcrypt release the GIL while hashing, so worker threads run
+# on separate cores. The limiter caps concurrent hashes at the core count.
+password_hash_limiter = anyio.CapacityLimiter(os.cpu_count() or 1)
 
-    to_encode = {"exp": expire, "sub": str(subject.user_id)}
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+async def get_password_hash_async(password: str) -> str:
+    return await anyio.to_thread.run_sync(get_password_hash, password, limiter=password_hash_limiter)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await anyio.to_thread.run_sync(
+        verify_password, plain_password, hashed_password, limiter=password_hash_limiter
+    )
+
+
+def create_access_token(subject: TokenPayload, expires_delta: Optional[timedelta] = None) -> str:
+    lifetime = int(expires_delta.total_seconds()) if expires_delta else ACCESS_TOKEN_EXPIRE_SECONDS
+    to_encode = {"exp": int(time.time()) + lifetime, "sub": str(subject.user_id)}
+    encoded_jwt = jwt.encode(to_encode, SIGNING_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 def decode_token(token: str) -> dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, VERIFYING_KEY, algorithms=[ALGORITHM], options={"require": ["exp", "sub"]})
         return payload
-    except JWTError:
+    except jwt.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
@@ -49,12 +111,16 @@ def decode_token(token: str) -> dict:
     
 
 def generate_api_key() -> str:
-    return bcrypt.gensalt(12).hex()
+    return API_KEY_PREFIX + secrets.token_urlsafe(32)
+
+
+def looks_like_api_key(api_key: str) -> bool:
+    return api_key.startswith(API_KEY_PREFIX)
 
 
-def hash_api_key(api_key: str) -> str:
-    return pwd_context.hash(api_key)
+def hash_api_key(api_key: str) -> bytes:
+    return hmac.new(API_KEY_PEPPER, api_key.encode(), hashlib.sha256).digest()
 
 
-def verify_api_key(api_key: str, hashed_api_key: str) -> bool:
-    return pwd_context.verify(api_key, hashed_api_key)
\ No newline at end of file
+def verify_api_key(api_key: str, hashed_api_key: bytes) -> bool:
+    return hmac.compare_digest(hash_api_key(api_key), hashed_api_key)
\ No newline at end of file
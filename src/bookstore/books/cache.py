@@ -0,0 +1,17 @@
+from typing import Hashable
+
+from cachetools import TTLCache
+
+
+CATEGORY_CACHE_TTL = 300
+
+
+# Rendered JSON bodies for the category read endpoints. Categories change
+# rarely, so responses are kept until CATEGORY_CACHE_TTL passes or a category
+# is written through BookCategoryService, whichever comes first.
+category_cache: TTLCache[Hashable, bytes] = TTLCache(maxsize=1_000, ttl=CATEGORY_CACHE_TTL)
+
+
+def invalidate_categories() -> None:
+    """Drop every cached category response."""
+    category_cache.clear()
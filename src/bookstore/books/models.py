@@ -2,7 +2,7 @@ from enum import Enum
 from uuid import UUID
 from typing import List, TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy import String, Integer
 
@@ -20,6 +20,9 @@ class BookStatus(str, Enum):
 
 class BookCategory(Base, UUIDMixin, TimeStampMixin):
     __tablename__ = "book_categories"
+    __table_args__ = (
+        Index("ix_book_categories_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
 
     name: Mapped[str] = mapped_column(String, nullable=False, unique=True, index=True)
     description: Mapped[str] = mapped_column(String, nullable=True)
@@ -29,6 +32,11 @@ class BookCategory(Base, UUIDMixin, TimeStampMixin):
 
 class BookTitle(Base, UUIDMixin, TimeStampMixin):
     __tablename__ = "book_titles"
+    __table_args__ = (
+        Index("ix_book_titles_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_book_titles_author_trgm", "author", postgresql_using="gin", postgresql_ops={"author": "gin_trgm_ops"}),
+        Index("ix_book_titles_created_at_id", "created_at", "id"),
+    )
 
     title: Mapped[str] = mapped_column(String, nullable=False, index=True)
     author: Mapped[str] = mapped_column(String, nullable=False, index=True)
@@ -44,12 +52,13 @@ class BookTitle(Base, UUIDMixin, TimeStampMixin):
     copies: Mapped[List["Book"]] = relationship(
         back_populates="book_title",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
 
 class Book(Base, UUIDMixin, TimeStampMixin):
     __tablename__ = "books"
+    __table_args__ = (Index("ix_books_book_title_id_status", "book_title_id", "status"),)
 
     book_title_id: Mapped[UUID] = mapped_column(ForeignKey("book_titles.id"), nullable=False)
     edition: Mapped[str] = mapped_column(String, nullable=False)
@@ -57,14 +66,14 @@ class Book(Base, UUIDMixin, TimeStampMixin):
     barcode: Mapped[str] = mapped_column(String, nullable=False, unique=True, index=True)
     status: Mapped[BookStatus] = mapped_column(default=BookStatus.AVAILABLE, nullable=False)
 
-    book_title: Mapped[BookTitle] = relationship(back_populates="copies", lazy="selectin")
+    book_title: Mapped[BookTitle] = relationship(back_populates="copies", lazy="raise_on_sql")
     borrow_records: Mapped[List["BorrowRecord"]] = relationship(
         back_populates="book",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
     book_requests: Mapped[List["BookRequest"]] = relationship(
         back_populates="book",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
\ No newline at end of file
@@ -2,9 +2,11 @@ from uuid import UUID
 from typing import Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, func, update, delete, and_
+from sqlalchemy import bindparam, exists, select, func, insert, tuple_, update, delete
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, contains_eager, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from .models import BookCategory, BookTitle, Book, BookStatus
 from .schemas import (
@@ -20,18 +22,60 @@ from .schemas import (
 )
 
 
+SELECT_CATEGORY_BY_NAME = select(BookCategory).where(BookCategory.name == bindparam("name"))
+SELECT_CATEGORY_BY_ID = select(BookCategory).where(BookCategory.id == bindparam("category_id"))
+SELECT_CATEGORY_HAS_TITLES = select(exists().where(BookTitle.category_id == bindparam("category_id")))
+SELECT_TITLE_BY_ISBN = select(BookTitle).where(BookTitle.isbn == bindparam("isbn"))
+SELECT_TITLE_BY_ID = select(BookTitle).where(BookTitle.id == bindparam("title_id"))
+SELECT_BOOK_BY_ID = select(Book).where(Book.id == bindparam("book_id"))
+SELECT_BOOK_BY_BARCODE = select(Book).where(Book.barcode == bindparam("barcode"))
+UPDATE_BOOK_CLAIM_FOR_BORROW = update(Book).where(
+    Book.id == bindparam("book_id"),
+    Book.status == BookStatus.AVAILABLE,
+).values(
+    status=BookStatus.BORROWED,
+).returning(Book)
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def _violates_foreign_key(error: IntegrityError) -> bool:
+    return getattr(error.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION
+
+
+def _select_titles_with_copy_counts():
+    # Built per call: relationship joins and loader options configure the
+    # mappers, which cannot happen until every model module is imported.
+    return (
+        select(
+            BookTitle,
+            func.count(Book.id).filter(Book.status == BookStatus.AVAILABLE).label("available_copies"),
+            func.count(Book.id).label("total_copies"),
+        )
+        .join(BookTitle.category)
+        .outerjoin(BookTitle.copies)
+        .options(contains_eager(BookTitle.category))
+        .group_by(BookTitle.id, BookCategory.id)
+    )
+
+
 class BookCategoryRepository:
+    __slots__ = ("session",)
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_by_name(self, name: str) -> Optional[BookCategory]:
-        result = await self.session.execute(select(BookCategory).where(BookCategory.name == name))
-        return result.scalars().first()
+        result = await self.session.execute(SELECT_CATEGORY_BY_NAME, {"name": name})
+        return result.scalar_one_or_none()
     
     async def get_by_id(self, category_id: UUID) -> Optional[BookCategory]:
-        result = await self.session.execute(select(BookCategory).where(BookCategory.id == category_id))
-        return result.scalars().first()
+        result = await self.session.execute(SELECT_CATEGORY_BY_ID, {"category_id": category_id})
+        return result.scalar_one_or_none()
     
+    async def has_titles(self, category_id: UUID) -> bool:
+        return bool(await self.session.scalar(SELECT_CATEGORY_HAS_TITLES, {"category_id": category_id}))
+
     async def get_all(self, params: BookCategoryFilter) -> List[BookCategory]:
         query = select(BookCategory).options(selectinload(BookCategory.books))
 
@@ -51,54 +95,65 @@ class BookCategoryRepository:
             .limit(params.limit)
             .offset(params.offset)
         )
-        return result.scalars()._allrows()
+        return result.scalars().all()
 
     async def create_category(self, category_data: BookCategoryCreate) -> BookCategory:
-        category = await self.get_by_name(category_data.name)
-        if category:
+        try:
+            result = await self.session.execute(
+                insert(BookCategory).values(**category_data.model_dump()).returning(BookCategory)
+            )
+        except IntegrityError:
+            await self.session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Category already exists",
             )
-        category = BookCategory(**category_data.model_dump())
-        self.session.add(category)
+        category = result.scalar_one()
         await self.session.commit()
-        await self.session.refresh(category)
         return category
     
     async def update_category(self, category_id: UUID, category_data: BookCategoryUpdate) -> BookCategory:
-        category = await self.get_by_id(category_id)
+        update_data = category_data.model_dump(exclude_unset=True)
+        if update_data:
+            result = await self.session.execute(
+                update(BookCategory)
+                .where(BookCategory.id == category_id)
+                .values(**update_data)
+                .returning(BookCategory)
+            )
+            category = result.scalar_one_or_none()
+        else:
+            category = await self.get_by_id(category_id)
+
         if not category:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Category not found",
             )
-        await self.session.execute(
-            update(BookCategory).where(BookCategory.id == category_id).values(**category_data.model_dump())
-        )
-        
         await self.session.commit()
-        await self.session.refresh(category)
         return category
     
     async def delete_category(self, category_id: UUID) -> bool:
-        category = await self.get_by_id(category_id)
-        if not category:
+        result = await self.session.execute(
+            delete(BookCategory).where(BookCategory.id == category_id).returning(BookCategory.id)
+        )
+        if result.scalar_one_or_none() is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Category not found",
             )
-        await self.session.execute(delete(BookCategory).where(BookCategory.id == category_id))
         await self.session.commit()
         return True
     
 
 class BookTitleRepository:
+    __slots__ = ("session",)
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_all_titles(self, params: BookTitleFilter) -> List[BookTitle]:
-        query = select(BookTitle).options(selectinload(BookTitle.category))
+        query = select(BookTitle).join(BookTitle.category).options(contains_eager(BookTitle.category))
 
         if params.title:
             query = query.where(BookTitle.title.ilike(f"%{params.title}%"))
@@ -110,97 +165,134 @@ class BookTitleRepository:
             query = query.where(BookTitle.isbn == params.isbn)
 
         if params.category_name:
-            query = query.join(BookCategory).where(BookCategory.name.ilike(f"%{params.category_name}%"))
+            query = query.where(BookCategory.name.ilike(f"%{params.category_name}%"))
 
         if params.include_copies:
-            query = query.options(
-                selectinload(BookTitle.category),
-                selectinload(BookTitle.copies),
+            query = query.options(selectinload(BookTitle.copies))
+
+        # Keyset pagination: continue after the cursor title's
+        # (created_at, id) instead of scanning and discarding OFFSET rows.
+        if params.after:
+            cursor_title = aliased(BookTitle)
+            cursor = (
+                select(cursor_title.created_at, cursor_title.id)
+                .where(cursor_title.id == params.after)
+                .scalar_subquery()
             )
+            query = query.where(tuple_(BookTitle.created_at, BookTitle.id) < cursor)
 
         result = await self.session.execute(
             query
+            .order_by(BookTitle.created_at.desc(), BookTitle.id.desc())
             .limit(params.limit)
-            .offset(params.offset)
         )
-        return result.scalars()._allrows()
+        return result.scalars().all()
 
     async def get_by_isbn(self, isbn: str, include_copies: bool = False) -> Optional[BookTitle]:
-        query = select(BookTitle).where(BookTitle.isbn == isbn)
+        query = SELECT_TITLE_BY_ISBN.options(joinedload(BookTitle.category, innerjoin=True))
 
         if include_copies:
-            query = query.options(
-                selectinload(BookTitle.category),
-                selectinload(BookTitle.copies),
-            )
+            query = query.options(selectinload(BookTitle.copies))
 
-        result = await self.session.execute(query)
-        return result.scalars().first()
+        result = await self.session.execute(query, {"isbn": isbn})
+        return result.scalar_one_or_none()
 
     async def get_by_id(self, title_id: UUID, include_copies: bool = False) -> Optional[BookTitle]:
-        query = select(BookTitle).where(BookTitle.id == title_id)
+        query = SELECT_TITLE_BY_ID.options(joinedload(BookTitle.category, innerjoin=True))
 
         if include_copies:
-            query = query.options(
-                selectinload(BookTitle.category),
-                selectinload(BookTitle.copies),
-            )
-        else:
-            query = query.options(selectinload(BookTitle.category))
+            query = query.options(selectinload(BookTitle.copies))
+
+        result = await self.session.execute(query, {"title_id": title_id})
+        return result.scalar_one_or_none()
+
+    async def get_with_copy_counts_by_id(
+        self, title_id: UUID, include_copies: bool = False
+    ) -> Optional[Tuple[BookTitle, int, int]]:
+        query = _select_titles_with_copy_counts().where(BookTitle.id == title_id)
+        if include_copies:
+            query = query.options(selectinload(BookTitle.copies))
+
+        result = await self.session.execute(query)
+        return result.one_or_none()
+
+    async def get_with_copy_counts_by_isbn(
+        self, isbn: str, include_copies: bool = False
+    ) -> Optional[Tuple[BookTitle, int, int]]:
+        query = _select_titles_with_copy_counts().where(BookTitle.isbn == isbn)
+        if include_copies:
+            query = query.options(selectinload(BookTitle.copies))
 
         result = await self.session.execute(query)
-        return result.scalars().first()
+        return result.one_or_none()
     
     async def create_title(self, title_data: BookTitleCreate) -> BookTitle:
-        title = await self.get_by_isbn(title_data.isbn)
-        if title:
+        # The foreign key on category_id stands in for a category lookup
+        # before the insert; RETURNING replaces the refresh after it.
+        try:
+            result = await self.session.execute(
+                insert(BookTitle).values(**title_data.model_dump()).returning(BookTitle)
+            )
+        except IntegrityError as error:
+            await self.session.rollback()
+            if _violates_foreign_key(error):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Category not found",
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Title with the ISBN already exists",
             )
-        title = BookTitle(**title_data.model_dump())
-        self.session.add(title)
+        title = result.scalar_one()
+        category = await self.session.get(BookCategory, title.category_id)
+        set_committed_value(title, "category", category)
         await self.session.commit()
-        await self.session.refresh(title)
         return title
     
     async def update_title(self, title_id: UUID, title_data: BookTitleUpdate) -> BookTitle:
-        title = await self.get_by_id(title_id)
-        if not title:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Title not found",
-            )
-        
-        if title_data.isbn and title_data.isbn != title.isbn:
+        if title_data.isbn:
             existing = await self.get_by_isbn(title_data.isbn)
-            if existing:
+            if existing and existing.id != title_id:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Title already exists",
                 )
 
-        await self.session.execute(
-            update(BookTitle).where(BookTitle.id == title_id).values(**title_data.model_dump(exclude_unset=True))
-        )
-        
+        update_data = title_data.model_dump(exclude_unset=True)
+        if update_data:
+            result = await self.session.execute(
+                update(BookTitle)
+                .where(BookTitle.id == title_id)
+                .values(**update_data)
+                .returning(BookTitle)
+            )
+            title = result.scalar_one_or_none()
+        else:
+            title = await self.get_by_id(title_id)
+
+        if not title:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Title not found",
+            )
         await self.session.commit()
-        await self.session.refresh(title)
         return title
     
     async def delete_title(self, title_id: UUID) -> bool:
-        title = await self.get_by_id(title_id)
-        if not title:
+        result = await self.session.execute(
+            delete(BookTitle).where(BookTitle.id == title_id).returning(BookTitle.id)
+        )
+        if result.scalar_one_or_none() is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Title not found",
             )
-        await self.session.execute(delete(BookTitle).where(BookTitle.id == title_id))
         await self.session.commit()
         return True
     
-    async def search(self, search_params: BookTitleSearchParams) -> Tuple[List[BookTitle], int]:
-        query = select(BookTitle).options(selectinload(BookTitle.category))
+    async def search(self, search_params: BookTitleSearchParams) -> Tuple[List[Tuple[BookTitle, int, int]], int]:
+        query = _select_titles_with_copy_counts()
 
         if search_params.title:
             query = query.where(BookTitle.title.ilike(f"%{search_params.title}%"))
@@ -212,128 +304,162 @@ class BookTitleRepository:
             query = query.where(BookTitle.isbn == search_params.isbn)
 
         if search_params.category_name:
-            query = query.where(BookTitle.category.ilike(f"%{search_params.category_name}%"))
-
-        count_query = select(func.count()).select_from(query.subquery())
-        total_count = await self.session.execute(count_query)
-        total = total_count.scalar_one()
+            query = query.where(BookCategory.name.ilike(f"%{search_params.category_name}%"))
 
-        query = query.limit(search_params.limit).offset((search_params.page - 1) * search_params.limit)
+        query = (
+            query.add_columns(func.count().over().label("total"))
+            .limit(search_params.limit)
+            .offset((search_params.page - 1) * search_params.limit)
+        )
 
+        # The window count is computed after GROUP BY but before LIMIT/OFFSET, so
+        # every row carries the number of matching titles. A page past the end
+        # comes back empty with 0.
         result = await self.session.execute(query)
-        return result.scalars()._allrows(), total
+        rows = result.all()
+        total = rows[0].total if rows else 0
+        return [(row[0], row.available_copies, row.total_copies) for row in rows], total
     
     async def get_copy_counts(self, title_id: UUID) -> Dict[str, int]:
-        total_query = select(func.count(Book.id)).where(Book.title_id == title_id)
-        total_result = await self.session.execute(total_query)
-        total_copies = total_result.scalar_one()
-
-        available_query = select(func.count(Book.id)).where(
-            and_(Book.title_id == title_id, Book.status == BookStatus.AVAILABLE)
-        )
-        available_result = await self.session.execute(available_query)
-        available_copies = available_result.scalar_one()
-
-        return {"total": total_copies, "available": available_copies}
-
         result = await self.session.execute(
             select(Book.status, func.count(Book.id))
-            .where(Book.title_id == title_id)
+            .where(Book.book_title_id == title_id)
             .group_by(Book.status)
         )
-        return {row[0]: row[1] for row in result.all()}
+        counts = dict(result.all())
+        return {
+            "total": sum(counts.values()),
+            "available": counts.get(BookStatus.AVAILABLE, 0),
+        }
     
 
 class BookRepository:
+    __slots__ = ("session",)
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_all(self, limit: int = 100, offset: int = 0) -> List[Book]:
-        result = await self.session.execute(
-            select(Book)
-            .options(selectinload(Book.book_title))
-            .limit(limit)
-            .offset(offset)
-        )
-        return result.scalars()._allrows()
+    async def get_all(self, limit: int = 100, offset: int = 0, include_title: bool = False) -> List[Book]:
+        query = select(Book).limit(limit).offset(offset)
+        if include_title:
+            query = query.options(
+                joinedload(Book.book_title, innerjoin=True).joinedload(BookTitle.category, innerjoin=True)
+            )
+
+        result = await self.session.execute(query)
+        return result.scalars().all()
     
-    async def get_all_for_title(self, title_id: UUID) -> List[Book]:
-        result = await self.session.execute(
-            select(Book)
-            .where(Book.book_title_id == title_id)
-            .options(selectinload(Book.book_title))
-        )
-        return result.scalars()._allrows()
+    async def get_all_for_title(self, title_id: UUID, include_title: bool = False) -> List[Book]:
+        query = select(Book).where(Book.book_title_id == title_id)
+        if include_title:
+            query = query.options(
+                joinedload(Book.book_title, innerjoin=True).joinedload(BookTitle.category, innerjoin=True)
+            )
+
+        result = await self.session.execute(query)
+        return result.scalars().all()
     
-    async def get_all_available_for_title(self, title_id: UUID) -> List[Book]:
-        result = await self.session.execute(
-            select(Book)
-            .where(Book.book_title_id == title_id, Book.status == BookStatus.AVAILABLE)
-            .options(selectinload(Book.book_title))
-        )
-        return result.scalars()._allrows()
+    async def get_all_available_for_title(self, title_id: UUID, include_title: bool = False) -> List[Book]:
+        query = select(Book).where(Book.book_title_id == title_id, Book.status == BookStatus.AVAILABLE)
+        if include_title:
+            query = query.options(
+                joinedload(Book.book_title, innerjoin=True).joinedload(BookTitle.category, innerjoin=True)
+            )
+
+        result = await self.session.execute(query)
+        return result.scalars().all()
     
-    async def get_by_id(self, book_id: UUID) -> Optional[Book]:
-        result = await self.session.execute(
-            select(Book)
-            .where(Book.id == book_id)
-            .options(selectinload(Book.book_title))
-        )
-        return result.scalars().first()
+    async def get_by_id(self, book_id: UUID, include_title: bool = False) -> Optional[Book]:
+        query = SELECT_BOOK_BY_ID
+        if include_title:
+            query = query.options(
+                joinedload(Book.book_title, innerjoin=True).joinedload(BookTitle.category, innerjoin=True)
+            )
+
+        result = await self.session.execute(query, {"book_id": book_id})
+        return result.scalar_one_or_none()
     
-    async def get_by_barcode(self, barcode: str) -> Optional[Book]:
-        result = await self.session.execute(
-            select(Book)
-            .where(Book.barcode == barcode)
-            .options(selectinload(Book.book_title))
-        )
-        return result.scalars().first()
+    async def get_by_barcode(self, barcode: str, include_title: bool = False) -> Optional[Book]:
+        query = SELECT_BOOK_BY_BARCODE
+        if include_title:
+            query = query.options(
+                joinedload(Book.book_title, innerjoin=True).joinedload(BookTitle.category, innerjoin=True)
+            )
+
+        result = await self.session.execute(query, {"barcode": barcode})
+        return result.scalar_one_or_none()
     
     async def create_book(self, book_data: BookCreate) -> Book:
-        book = await self.get_by_barcode(book_data.barcode)
-        if book:
+        try:
+            result = await self.session.execute(
+                insert(Book).values(**book_data.model_dump()).returning(Book)
+            )
+        except IntegrityError as error:
+            await self.session.rollback()
+            if _violates_foreign_key(error):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Title not found",
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Book already exists",
             )
-        book = Book(**book_data.model_dump())
-        self.session.add(book)
+        book = result.scalar_one()
         await self.session.commit()
-        await self.session.refresh(book)
         return book
     
     async def update_book(self, book_id: UUID, book_data: BookUpdate) -> Book:
-        book = await self.get_by_id(book_id)
+        update_data = book_data.model_dump(exclude_unset=True)
+        if update_data:
+            result = await self.session.execute(
+                update(Book)
+                .where(Book.id == book_id)
+                .values(**update_data)
+                .returning(Book)
+            )
+            book = result.scalar_one_or_none()
+        else:
+            book = await self.get_by_id(book_id)
+
         if not book:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Book not found",
             )
-        await self.session.execute(
-            update(Book).where(Book.id == book_id).values(**book_data.model_dump(exclude_unset=True))
-        )
-        
         await self.session.commit()
-        await self.session.refresh(book)
         return book
 
     async def delete_book(self, book_id: UUID) -> bool:
-        book = await self.get_by_id(book_id)
-        if not book:
+        result = await self.session.execute(
+            delete(Book).where(Book.id == book_id).returning(Book.id)
+        )
+        if result.scalar_one_or_none() is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Book not found",
             )
-        await self.session.execute(delete(Book).where(Book.id == book_id))
         await self.session.commit()
         return True
     
+    async def claim_for_borrow(self, book_id: UUID) -> Optional[Book]:
+        # Flips AVAILABLE to BORROWED in one statement; no row back means the
+        # book is missing or someone else got it first. Left uncommitted so the
+        # caller can insert the borrow record in the same transaction.
+        result = await self.session.execute(UPDATE_BOOK_CLAIM_FOR_BORROW, {"book_id": book_id})
+        return result.scalar_one_or_none()
+
     async def update_status(self, book_id: UUID, book_status: BookStatus) -> Book:
-        book = await self.get_by_id(book_id)
+        result = await self.session.execute(
+            update(Book)
+            .where(Book.id == book_id)
+            .values(status=book_status)
+            .returning(Book)
+        )
+        book = result.scalar_one_or_none()
         if not book:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Book not found",
             )
-        await self.session.execute(update(Book).where(Book.id == book_id).values(status=book_status))
         return book
\ No newline at end of file
@@ -1,11 +1,12 @@
 from uuid import UUID
 from typing import Annotated, List
 
-from fastapi import APIRouter, Depends, HTTPException,Query, status
+from fastapi import APIRouter, Depends, HTTPException,Query, Response, status
 
 from bookstore.auth.models import User
 from bookstore.auth.dependencies import user_is_librarian_or_admin
 
+from .cache import category_cache
 from .models import BookStatus
 from .services import BookCategoryService, BookService
 from .dependencies import get_category_service, get_book_service
@@ -14,7 +15,6 @@ from .schemas import (
     BookCategoryResponse,
     BookCategoryUpdate,
     BookCategoryFilter,
-    BookCategoryDetailResponse,
     BookCreate,
     BookResponse,
     BookTitleCreate,
@@ -24,16 +24,66 @@ from .schemas import (
     BookTitleSearchParams,
     BookTitleSearchResponse,
     BookTitleUpdate,
-    BookUpdate
+    BookUpdate,
+    BOOK_LIST_ADAPTER,
+    CATEGORY_LIST_ADAPTER,
+    TITLE_DETAIL_LIST_ADAPTER,
 )
 
 
 router = APIRouter()
 
 
+# Responses for rows just loaded from the database are built with
+# model_construct: the data is already typed, so validation would only
+# repeat work. Read routes return them as ready-made responses, which also
+# skips FastAPI's response_model pass; response_model stays for the OpenAPI
+# docs. Lists go through the module-level TypeAdapters in one dump_json call.
+# Optional fields that are None (mostly descriptions) are left out of the
+# body; none of them are required in the schema.
+# Inbound payloads are still validated as usual.
+def _category_to_response(category) -> BookCategoryResponse:
+    return BookCategoryResponse.model_construct(
+        id=category.id,
+        name=category.name,
+        description=category.description,
+        created_at=category.created_at,
+        updated_at=category.updated_at,
+    )
+
+
+def _book_to_response(book) -> BookResponse:
+    return BookResponse.model_construct(
+        id=book.id,
+        book_title_id=book.book_title_id,
+        edition=book.edition,
+        published_year=book.published_year,
+        barcode=book.barcode,
+        status=book.status,
+        created_at=book.created_at,
+        updated_at=book.updated_at,
+    )
+
+
+def _title_to_response(title, response_class=BookTitleResponse, **fields) -> BookTitleResponse:
+    return response_class.model_construct(
+        id=title.id,
+        title=title.title,
+        author=title.author,
+        isbn=title.isbn,
+        description=title.description,
+        publisher=title.publisher,
+        category_id=title.category_id,
+        category=_category_to_response(title.category),
+        created_at=title.created_at,
+        updated_at=title.updated_at,
+        **fields,
+    )
+
+
 @router.post(
     "/categories",
-    response_model=BookCategoryDetailResponse,
+    response_model=BookCategoryResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Create a new book category",
     tags=["categories"],
@@ -43,7 +93,8 @@ async def create_category(
     user: User = Depends(user_is_librarian_or_admin),
     service: BookCategoryService = Depends(get_category_service),
 ):
-    return await service.create_category(data)
+    # A new category has no titles yet, so there is no books list to load.
+    return _category_to_response(await service.create_category(data))
 
 
 @router.get(
@@ -57,7 +108,15 @@ async def get_all_categories(
     params: BookCategoryFilter = Depends(),
     service: BookCategoryService = Depends(get_category_service),
 ):
-    return await service.get_all_categories(params)
+    cache_key = ("list", params.name, params.description, params.offset, params.limit)
+    body = category_cache.get(cache_key)
+    if body is None:
+        categories = await service.get_all_categories(params)
+        body = CATEGORY_LIST_ADAPTER.dump_json(
+            [_category_to_response(category) for category in categories], exclude_none=True
+        )
+        category_cache[cache_key] = body
+    return Response(content=body, media_type="application/json")
 
 
 @router.get(
@@ -71,7 +130,17 @@ async def get_category_by_id(
     category_id: UUID,
     service: BookCategoryService = Depends(get_category_service),
 ):
-    return await service.get_category_by_id(category_id)
+    body = category_cache.get(category_id)
+    if body is None:
+        category = await service.get_category_by_id(category_id)
+        if not category:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            )
+        body = _category_to_response(category).model_dump_json(exclude_none=True)
+        category_cache[category_id] = body
+    return Response(content=body, media_type="application/json")
 
 
 @router.put(
@@ -130,7 +199,18 @@ async def get_all_titles(
     params: Annotated[BookTitleFilter, Query(...)],
     service: BookService = Depends(get_book_service),
 ):
-    return await service.get_all_titles(params)
+    titles = await service.get_all_titles(params)
+    # A full page means there may be more; pass the last id back as ?after=.
+    headers = {"X-Next-Cursor": str(titles[-1].id)} if titles and len(titles) == params.limit else None
+    body = TITLE_DETAIL_LIST_ADAPTER.dump_json([
+        _title_to_response(
+            title,
+            BookTitleDetailResponse,
+            copies=[_book_to_response(copy) for copy in title.copies] if params.include_copies else [],
+        )
+        for title in titles
+    ], exclude_none=True)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get(
@@ -144,27 +224,21 @@ async def search_titles(
     params: Annotated[BookTitleSearchParams, Query(...)],
     service: BookService = Depends(get_book_service),
 ):
-    items = []
     books, total = await service.search_titles(params)
-
-    for book in books:
-        if book.copies:
-            available_copies = sum(1 for copy in book.copies if copy.status == BookStatus.AVAILABLE)
-            total_copies = len(book.copies)
-            
-            data = BookTitleResponse.model_validate(book)
-            data.available_copies = available_copies
-            data.total_copies = total_copies
-            items.append(data)
+    items = [
+        _title_to_response(book, available_copies=available_copies, total_copies=total_copies)
+        for book, available_copies, total_copies in books
+    ]
 
     total_pages = (total + params.limit - 1) // params.limit if total > 0 else 0
-    return BookTitleSearchResponse(
+    response = BookTitleSearchResponse.model_construct(
         items=items,
         total=total,
         page=params.page,
         limit=params.limit,
         pages=total_pages,
     )
+    return Response(content=response.model_dump_json(exclude_none=True), media_type="application/json")
 
 
 @router.put(
@@ -208,24 +282,23 @@ async def get_title_by_id(
     include_copies: bool = False,
     service: BookService = Depends(get_book_service),
 ):
-    title = await service.get_title_by_id(title_id, include_copies=include_copies)
+    row = await service.get_title_by_id(title_id, include_copies=include_copies)
 
-    if not title:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Book title not found"
         )
     
-    data = BookTitleResponse.model_validate(title)
-
-    if title.copies:
-        available_copies = sum(1 for copy in title.copies if copy.status == BookStatus.AVAILABLE)
-        total_copies = len(title.copies)
-
-        data.available_copies = available_copies
-        data.total_copies = total_copies
-
-    return data
+    title, available_copies, total_copies = row
+    response = _title_to_response(
+        title,
+        BookTitleDetailResponse,
+        copies=[_book_to_response(copy) for copy in title.copies] if include_copies else [],
+        available_copies=available_copies,
+        total_copies=total_copies,
+    )
+    return Response(content=response.model_dump_json(exclude_none=True), media_type="application/json")
 
 @router.get(
     "/titles/isbn/{isbn}",
@@ -239,21 +312,23 @@ async def get_title_by_isbn(
     include_copies: bool = False,
     service: BookService = Depends(get_book_service)
 ):
-    if include_copies:
-        title = await service.get_title_by_isbn(isbn, include_copies)
+    row = await service.get_title_by_isbn(isbn, include_copies=include_copies)
 
-        data = BookTitleDetailResponse.model_validate(title)
-        if title and title.copies:
-            available_copies = sum(1 for copy in title.copies if copy.status == BookStatus.AVAILABLE)
-            total_copies = len(title.copies)
-
-
-            data.available_copies = available_copies
-            data.total_copies = total_copies
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Book title not found"
+        )
 
-        return data
-    
-    return await service.get_title_by_isbn(isbn)
+    title, available_copies, total_copies = row
+    response = _title_to_response(
+        title,
+        BookTitleDetailResponse,
+        copies=[_book_to_response(copy) for copy in title.copies] if include_copies else [],
+        available_copies=available_copies,
+        total_copies=total_copies,
+    )
+    return Response(content=response.model_dump_json(exclude_none=True), media_type="application/json")
 
 
 
@@ -289,37 +364,48 @@ async def get_all_copies_of_title(
         copies = await service.get_all_available_books_for_title(title_id)
     else:
         copies = await service.get_all_books_for_title(title_id)
-    return copies
+    body = BOOK_LIST_ADAPTER.dump_json([_book_to_response(copy) for copy in copies])
+    return Response(content=body, media_type="application/json")
 
 
 @router.get(
-    "/copies/{book_id}",
+    "/copies/barcode/{barcode}",
     response_model=BookResponse,
     status_code=status.HTTP_200_OK,
-    summary="Get a book copy of a title by ID",
+    summary="Get a book copy of a title by barcode",
     tags=["book copies"]
 )
-async def get_copy_by_id(
-    book_id: UUID,
+async def get_copy_by_barcode(
+    barcode: str,
     service: BookService = Depends(get_book_service)
 ):
-    copy = await service.get_book_by_id(book_id)
-    return copy
+    copy = await service.get_book_by_barcode(barcode)
+    if not copy:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Book not found"
+        )
+    return Response(content=_book_to_response(copy).model_dump_json(), media_type="application/json")
 
 
 @router.get(
-    "/copies/{barcode}",
+    "/copies/{book_id}",
     response_model=BookResponse,
     status_code=status.HTTP_200_OK,
-    summary="Get a book copy of a title by barcode",
+    summary="Get a book copy of a title by ID",
     tags=["book copies"]
 )
-async def get_copy_by_barcode(
-    barcode: str,
+async def get_copy_by_id(
+    book_id: UUID,
     service: BookService = Depends(get_book_service)
 ):
-    copy = await service.get_book_by_barcode(barcode)
-    return copy
+    copy = await service.get_book_by_id(book_id)
+    if not copy:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Book not found"
+        )
+    return Response(content=_book_to_response(copy).model_dump_json(), media_type="application/json")
 
 
 @router.put(
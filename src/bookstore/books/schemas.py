@@ -2,7 +2,7 @@ from uuid import UUID
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 from .models import BookStatus
 
@@ -26,9 +26,7 @@ class BookCategoryResponse(BookCategoryBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-        json_encoders = {UUID: str}
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BookCategoryFilter(BaseModel):
@@ -51,9 +49,6 @@ class BookTitleBase(BaseModel):
     publisher: str
     category_id: UUID
 
-    class Config:
-        json_encoders = {UUID: str}
-
 
 class BookTitleCreate(BookTitleBase):
     pass
@@ -75,33 +70,25 @@ class BookBase(BaseModel):
     barcode: str
     status: BookStatus = Field(default=BookStatus.AVAILABLE)
 
-    class Config:
-        json_encoders = {UUID: str}
-
 
 class BookCreate(BookBase):
     pass
 
 
 class BookUpdate(BaseModel):
-    title_id: Optional[UUID] = None
+    book_title_id: Optional[UUID] = None
     edition: Optional[str] = None
     published_year: Optional[int] = None
     barcode: Optional[str] = None
     status: Optional[BookStatus] = None
 
-    class Config:
-        json_encoders = {UUID: str}
-
 
 class BookResponse(BookBase):
     id: UUID
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-        json_encoders = {UUID: str}
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BookTitleResponse(BookTitleBase):
@@ -112,9 +99,7 @@ class BookTitleResponse(BookTitleBase):
     available_copies: int = 0
     total_copies: int = 0
 
-    class Config:
-        from_attributes = True
-        json_encoders = {UUID: str}
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BookDetailResponse(BookBase):
@@ -127,7 +112,7 @@ class BookTitleFilter(BaseModel):
     publisher: Optional[str] = None
     category_name: Optional[str] = None
     include_copies: Optional[bool] = False
-    offset: Optional[int] = 0
+    after: Optional[UUID] = None
     limit: Optional[int] = 10
 
 class BookTitleDetailResponse(BookTitleResponse):
@@ -158,3 +143,8 @@ class BookTitleSearchResponse(BaseModel):
     @property
     def next_page(self) -> Optional[int]:
         return self.page + 1 if self.page < self.pages else None
+
+
+CATEGORY_LIST_ADAPTER = TypeAdapter(list[BookCategoryResponse])
+TITLE_DETAIL_LIST_ADAPTER = TypeAdapter(list[BookTitleDetailResponse])
+BOOK_LIST_ADAPTER = TypeAdapter(list[BookResponse])
@@ -3,6 +3,7 @@ from typing import List, Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 
+from .cache import invalidate_categories
 from .models import BookCategory, BookTitle, Book, BookStatus
 from .repositories import BookCategoryRepository, BookTitleRepository, BookRepository
 from .schemas import (
@@ -31,22 +32,14 @@ class BookCategoryService:
         return await self.repository.get_by_id(category_id)
 
     async def create_category(self, category_data: BookCategoryCreate) -> BookCategory:
-        existing = await self.repository.get_by_name(category_data.name)
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Category already exists",
-            )
-        return await self.repository.create_category(category_data)
+        category = await self.repository.create_category(category_data)
+        invalidate_categories()
+        return category
     
     async def update_category(self, category_id: UUID, category_data: BookCategoryUpdate) -> BookCategory:
-        existing = await self.repository.get_by_id(category_id)
-        if not existing:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found",
-            )
-        return await self.repository.update_category(category_id, category_data)
+        category = await self.repository.update_category(category_id, category_data)
+        invalidate_categories()
+        return category
     
     async def delete_category(self, category_id: UUID) -> bool:
         category = await self.repository.get_by_id(category_id)
@@ -56,13 +49,15 @@ class BookCategoryService:
                 detail="Category not found",
             )
         
-        if category.books:
+        if await self.repository.has_titles(category_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Category has books",
             )
         
-        return await self.repository.delete_category(category_id)
+        result = await self.repository.delete_category(category_id)
+        invalidate_categories()
+        return result
     
 
 class BookService:
@@ -76,31 +71,21 @@ class BookService:
         self.book_title_repository = book_title_repository
         self.book_category_repository = book_category_repository
 
-    async def get_title_by_id(self, title_id: UUID, include_copies: bool = False) -> Optional[BookTitle]:
-        return await self.book_title_repository.get_by_id(title_id, include_copies)
+    async def get_title_by_id(
+        self, title_id: UUID, include_copies: bool = False
+    ) -> Optional[Tuple[BookTitle, int, int]]:
+        return await self.book_title_repository.get_with_copy_counts_by_id(title_id, include_copies)
     
-    async def get_title_by_isbn(self, isbn: str, include_copies: bool = False) -> Optional[BookTitle]:
-        return await self.book_title_repository.get_by_isbn(isbn, include_copies)
+    async def get_title_by_isbn(
+        self, isbn: str, include_copies: bool = False
+    ) -> Optional[Tuple[BookTitle, int, int]]:
+        return await self.book_title_repository.get_with_copy_counts_by_isbn(isbn, include_copies)
     
     async def get_all_titles(self, params: BookTitleFilter) -> List[BookTitleDetailResponse]:
         return await self.book_title_repository.get_all_titles(params)
     
     async def create_title(self, title_data: BookTitleCreate) -> BookTitle:
-        category = await self.book_category_repository.get_by_id(title_data.category_id)
-        if not category:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found",
-            )
-        existing = await self.book_title_repository.get_by_isbn(title_data.isbn)
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Title already exists",
-            )
-        
-        book_title = await self.book_title_repository.create_title(title_data)
-        return book_title
+        return await self.book_title_repository.create_title(title_data)
     
     async def update_title(self, title_id: UUID, title_data: BookTitleUpdate) -> BookTitle:
         if title_data.category_id:
@@ -122,7 +107,7 @@ class BookService:
             )
         return await self.book_title_repository.delete_title(title_id)
     
-    async def search_titles(self, search_params: BookTitleSearchParams) -> Tuple[List[BookTitle], int]:
+    async def search_titles(self, search_params: BookTitleSearchParams) -> Tuple[List[Tuple[BookTitle, int, int]], int]:
         books, total = await self.book_title_repository.search(search_params)
         return books, total
     
@@ -142,17 +127,11 @@ class BookService:
         return await self.book_repository.get_all_available_for_title(title_id)
     
     async def create_book(self, book_data: BookCreate) -> Book:
-        title = await self.book_title_repository.get_by_id(book_data.book_title_id)
-        if not title:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Title not found",
-            )
         return await self.book_repository.create_book(book_data)
     
     async def update_book(self, book_id: UUID, book_data: BookUpdate) -> Book:
-        if book_data.title_id:
-            title = await self.book_title_repository.get_by_id(book_data.title_id)
+        if book_data.book_title_id:
+            title = await self.book_title_repository.get_by_id(book_data.book_title_id)
             if not title:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -1,6 +1,8 @@
 from fastapi import Depends
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from bookstore.database.redis import get_redis
 from bookstore.database.session import get_session
 from bookstore.books.repositories import BookRepository
 
@@ -10,6 +12,7 @@ from .repositories import BorrowRecordRepository, BookRequestRepository
 
 async def get_borrow_service(
     session: AsyncSession = Depends(get_session),
+    cache: Redis = Depends(get_redis),
 ) -> BorrowService:
     book_request_repository = BookRequestRepository(session)
     borrow_record_repository = BorrowRecordRepository(session)
@@ -18,4 +21,5 @@ async def get_borrow_service(
         borrow_record_repository=borrow_record_repository,
         book_request_repository=book_request_repository,
         book_repository=book_repository,
+        cache=cache,
     )
\ No newline at end of file
@@ -4,7 +4,7 @@ from enum import Enum
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import func, Boolean, ForeignKey, TIMESTAMP
+from sqlalchemy import func, Boolean, CheckConstraint, ForeignKey, Index, TIMESTAMP
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from bookstore.database.models import Base, TimeStampMixin, UUIDMixin
@@ -31,9 +31,19 @@ class BookRequestStatus(str, Enum):
 
 class BorrowRecord(Base, TimeStampMixin, UUIDMixin):
     __tablename__ = "borrow_records"
+    __table_args__ = (
+        Index("ix_borrow_records_user_id_status", "user_id", "status"),
+        Index("ix_borrow_records_borrowed_date_id", "borrowed_date", "id"),
+        CheckConstraint("due_date > borrowed_date", name="due_after_borrowed"),
+        Index(
+            "ix_borrow_records_active_book_id",
+            "book_id",
+            postgresql_where="status IN ('BORROWED', 'OVERDUE')",
+        ),
+    )
 
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), primary_key=True)
-    book_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("books.id"), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
+    book_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("books.id"), nullable=False)
     returned: Mapped[bool] = mapped_column(Boolean, default=False)
     borrowed_date: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
@@ -51,15 +61,22 @@ class BorrowRecord(Base, TimeStampMixin, UUIDMixin):
     )
     status: Mapped[BorrowStatus] = mapped_column(default=BorrowStatus.BORROWED, nullable=False)
 
-    book: Mapped["Book"] = relationship(back_populates="borrow_records")
+    book: Mapped["Book"] = relationship(back_populates="borrow_records", lazy="raise_on_sql")
     # user: Mapped["User"] = relationship(back_populates="borrow_records")
 
 
 class BookRequest(Base, TimeStampMixin, UUIDMixin):
     __tablename__ = "book_requests"
+    __table_args__ = (
+        Index(
+            "ix_book_requests_pending_book_id",
+            "book_id",
+            postgresql_where="status = 'PENDING'",
+        ),
+    )
 
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), primary_key=True)
-    book_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("books.id"), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+    book_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("books.id"), nullable=False)
     requested_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
         server_default=func.now(),
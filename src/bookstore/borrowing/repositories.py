@@ -1,140 +1,297 @@
 from uuid import UUID
 from datetime import datetime, timezone
-from typing import Any, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import Query
+from fastapi import HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, and_, or_, desc
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy import String, bindparam, cast, exists, func, insert, literal, null, select, tuple_, union_all, update, desc
+
+from bookstore.books.models import Book, BookTitle
 
 from .models import BorrowRecord, BorrowStatus, BookRequest, BookRequestStatus
 from .schemas import BorrowRecordCreate, BorrowHistoryFilter, BookRequestFilter, ReturnRequest
 
 
+ACTIVE_BORROW_STATUSES: Tuple[BorrowStatus, ...] = (BorrowStatus.BORROWED, BorrowStatus.OVERDUE)
+IS_ACTIVE_BORROW = BorrowRecord.status.in_(ACTIVE_BORROW_STATUSES)
+
+BORROW_HISTORY_YIELD_PER = 200
+CHECK_VIOLATION = "23514"
+
+# Rows per multi-row INSERT in BookRequestRepository.create_many; keeps each
+# statement well under asyncpg's 32767 bind parameter limit.
+BOOK_REQUEST_INSERT_CHUNK_SIZE = 500
+
+SELECT_BORROW_BY_ID = select(BorrowRecord).where(BorrowRecord.id == bindparam("borrow_id"))
+SELECT_ACTIVE_BORROW_FOR_BOOK = select(BorrowRecord).where(
+    BorrowRecord.book_id == bindparam("book_id"),
+    IS_ACTIVE_BORROW,
+)
+SELECT_BOOK_WITH_ACTIVE_BORROW = (
+    select(Book, BorrowRecord)
+    .outerjoin(
+        BorrowRecord,
+        (BorrowRecord.book_id == Book.id) & IS_ACTIVE_BORROW,
+    )
+    .where(Book.id == bindparam("book_id"))
+    .limit(1)
+)
+SELECT_ACTIVE_BORROWS_FOR_READER = select(BorrowRecord).where(
+    BorrowRecord.user_id == bindparam("user_id"),
+    IS_ACTIVE_BORROW,
+).order_by(BorrowRecord.due_date)
+SELECT_OVERDUE_BORROWS_FOR_READER = select(BorrowRecord).where(
+    BorrowRecord.user_id == bindparam("user_id"),
+    BorrowRecord.status == BorrowStatus.OVERDUE,
+).order_by(desc(BorrowRecord.due_date))
+
+# Active borrows and pending requests for one reader in a single round-trip.
+# Both halves share one column shape; "source" tells the rows apart and the
+# enum statuses come back as their member names.
+SELECT_READER_DASHBOARD = union_all(
+    select(
+        literal("borrow").label("source"),
+        BorrowRecord.id,
+        BorrowRecord.book_id,
+        BorrowRecord.user_id,
+        cast(BorrowRecord.status, String).label("status"),
+        BorrowRecord.borrowed_date.label("started_at"),
+        BorrowRecord.due_date,
+        BorrowRecord.return_date,
+        BorrowRecord.updated_at,
+    ).where(
+        BorrowRecord.user_id == bindparam("user_id"),
+        IS_ACTIVE_BORROW,
+    ),
+    select(
+        literal("request"),
+        BookRequest.id,
+        BookRequest.book_id,
+        BookRequest.user_id,
+        cast(BookRequest.status, String),
+        BookRequest.requested_at,
+        null(),
+        null(),
+        BookRequest.updated_at,
+    ).where(
+        BookRequest.user_id == bindparam("user_id"),
+        BookRequest.status == BookRequestStatus.PENDING,
+    ),
+).order_by("started_at")
+
+SELECT_PENDING_REQUEST_EXISTS = select(
+    exists().where(
+        BookRequest.book_id == bindparam("book_id"),
+        BookRequest.user_id == bindparam("user_id"),
+        BookRequest.status == BookRequestStatus.PENDING,
+    )
+)
+
+UPDATE_PENDING_REQUEST_STATUS = update(BookRequest).where(
+    BookRequest.id == bindparam("request_id"),
+    BookRequest.status == BookRequestStatus.PENDING,
+).values(
+    status=bindparam("new_status"),
+).returning(BookRequest).execution_options(populate_existing=True)
+
+# Values bound at execute time are not synchronized onto a BorrowRecord the
+# session already holds, so RETURNING must overwrite it with the new row.
+UPDATE_BORROW_RETURNED = update(BorrowRecord).where(
+    BorrowRecord.id == bindparam("borrow_id"),
+    IS_ACTIVE_BORROW,
+).values(
+    return_date=bindparam("returned_date"),
+    status=BorrowStatus.RETURNED,
+).returning(BorrowRecord).execution_options(populate_existing=True)
+UPDATE_BORROW_LOST = update(BorrowRecord).where(
+    BorrowRecord.id == bindparam("borrow_id"),
+    IS_ACTIVE_BORROW,
+).values(
+    status=BorrowStatus.LOST,
+).returning(BorrowRecord).execution_options(populate_existing=True)
+UPDATE_BORROW_OVERDUE = update(BorrowRecord).where(
+    BorrowRecord.id == bindparam("borrow_id"),
+    BorrowRecord.status == BorrowStatus.BORROWED,
+    BorrowRecord.due_date < bindparam("now"),
+).values(
+    status=BorrowStatus.OVERDUE,
+).returning(BorrowRecord).execution_options(populate_existing=True)
+UPDATE_ALL_OVERDUE = update(BorrowRecord).where(
+    BorrowRecord.status == BorrowStatus.BORROWED,
+    BorrowRecord.due_date < func.now(),
+).values(
+    status=BorrowStatus.OVERDUE,
+).returning(BorrowRecord.id).execution_options(synchronize_session=False)
+
+
+def _paginate_borrows(query, params: BorrowHistoryFilter):
+    if params.borrow_status:
+        query = query.where(BorrowRecord.status.in_(params.borrow_status))
+
+    # Keyset on (borrowed_date, id) when the client hands back the last row it
+    # saw; plain OFFSET otherwise.
+    if params.after_borrowed_date is not None and params.after_id is not None:
+        query = query.where(
+            tuple_(BorrowRecord.borrowed_date, BorrowRecord.id)
+            < tuple_(params.after_borrowed_date, params.after_id)
+        )
+    else:
+        query = query.offset(params.offset)
+
+    return query.order_by(desc(BorrowRecord.borrowed_date), desc(BorrowRecord.id)).limit(params.limit)
+
+
+def _with_book_title(query):
+    # One extra IN query each for the copies and their titles instead of a
+    # lookup per row; the title's category is not needed for list responses.
+    return query.options(
+        selectinload(BorrowRecord.book)
+        .selectinload(Book.book_title)
+        .raiseload(BookTitle.category)
+    )
+
+
 class BorrowRecordRepository:
+    __slots__ = ("session",)
+
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
     async def get_active_borrow_for_book(self, book_id: UUID) -> Optional[BorrowRecord]:
-        active_statuses = (BorrowStatus.BORROWED, BorrowStatus.OVERDUE)
-        query = select(BorrowRecord).filter(
-            BorrowRecord.book_id == book_id,
-            BorrowRecord.status.in_(active_statuses),
-        )
-        result = await self.session.execute(query)
+        result = await self.session.execute(SELECT_ACTIVE_BORROW_FOR_BOOK, {"book_id": book_id})
         return result.scalar_one_or_none()
 
+    async def get_book_with_active_borrow(
+        self, book_id: UUID
+    ) -> Optional[Tuple[Book, Optional[BorrowRecord]]]:
+        result = await self.session.execute(SELECT_BOOK_WITH_ACTIVE_BORROW, {"book_id": book_id})
+        return result.one_or_none()
+
+    async def get_reader_dashboard(self, user_id: UUID) -> List[Any]:
+        result = await self.session.execute(SELECT_READER_DASHBOARD, {"user_id": user_id})
+        return result.all()
+
     async def get_reader_borrow_history(
         self,
         user_id: UUID,
         params: BorrowHistoryFilter = Query(...),
     ) -> List[BorrowRecord]:
-        query = select(BorrowRecord).where(BorrowRecord.user_id == user_id)
-
-        if params.borrow_status:
-            query = query.filter(BorrowRecord.status.in_(params.borrow_status))
-
-        query = query.order_by(desc(BorrowRecord.borrowed_date)).offset(params.offset).limit(params.limit)
-
-        result = await self.session.execute(query)
-        return result.scalars()._allrows()
-
-    async def get_active_borrows_for_reader(self, user_id: UUID) -> Optional[BorrowRecord]:
-        active_statuses = (BorrowStatus.ACCEPTED, BorrowStatus.OVERDUE)
-        query = select(BorrowRecord).where(
-            and_(
-                BorrowRecord.user_id == user_id,
-                BorrowRecord.status.in_(active_statuses),
-            )
-        ).order_by(BorrowRecord.due_date)
-
+        query = _with_book_title(
+            _paginate_borrows(select(BorrowRecord).where(BorrowRecord.user_id == user_id), params)
+        )
         result = await self.session.execute(query)
-        return result.scalars()._allrows()
+        return result.scalars().all()
 
-    async def get_overdue_borrows_for_reader(self, user_id: UUID) -> List[BorrowRecord]:
-        query = select(BorrowRecord).where(
-            and_(
-                BorrowRecord.user_id == user_id,
-                BorrowRecord.status == BorrowStatus.OVERDUE,
+    async def stream_reader_borrow_history(
+        self,
+        user_id: UUID,
+        params: BorrowHistoryFilter,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        query = _paginate_borrows(
+            select(
+                BorrowRecord.id,
+                BorrowRecord.book_id,
+                BorrowRecord.user_id,
+                BorrowRecord.borrowed_date,
+                BorrowRecord.due_date,
+                BorrowRecord.return_date,
+                BorrowRecord.status,
+                BookTitle.title,
+                BookTitle.author,
+                BookTitle.isbn,
             )
-        )._order_by(desc(BorrowRecord.due_date))
+            .join(Book, Book.id == BorrowRecord.book_id)
+            .join(BookTitle, BookTitle.id == Book.book_title_id)
+            .where(BorrowRecord.user_id == user_id),
+            params,
+        ).execution_options(yield_per=BORROW_HISTORY_YIELD_PER)
+        result = await self.session.stream(query)
+        async for row in result.mappings():
+            yield dict(row)
+
+    async def get_active_borrows_for_reader(self, user_id: UUID) -> List[BorrowRecord]:
+        result = await self.session.execute(
+            _with_book_title(SELECT_ACTIVE_BORROWS_FOR_READER), {"user_id": user_id}
+        )
+        return result.scalars().all()
 
-        result = await self.session.execute(query)
-        return result.scalars()._allrows()
+    async def get_overdue_borrows_for_reader(self, user_id: UUID) -> List[BorrowRecord]:
+        result = await self.session.execute(
+            _with_book_title(SELECT_OVERDUE_BORROWS_FOR_READER), {"user_id": user_id}
+        )
+        return result.scalars().all()
 
     async def mark_borrow_as_returned(
         self,
         return_data: ReturnRequest,
     ) -> Optional[BorrowRecord]:
-        query = update(BorrowRecord).where(
-            and_(
-                BorrowRecord.id == return_data.borrow_id,
-                or_(
-                    BorrowRecord.status == BorrowStatus.BORROWED,
-                    BorrowRecord.status == BorrowStatus.OVERDUE,
-                )
-            )
-        ).values(
-            return_date=return_data.returned_date,
-            status=BorrowStatus.RETURNED,
-        ).returning(BorrowRecord)
-
-        result = await self.session.execute(query)
-        await self.session.commit()
+        result = await self.session.execute(
+            UPDATE_BORROW_RETURNED,
+            {"borrow_id": return_data.borrow_id, "returned_date": return_data.returned_date},
+        )
         return result.scalar_one_or_none()
 
     async def mark_borrow_as_lost(self, borrow_id: UUID) -> Optional[BorrowRecord]:
-        query = update(BorrowRecord).where(
-            and_(
-                BorrowRecord.id == borrow_id,
-                or_(
-                    BorrowRecord.status == BorrowStatus.BORROWED,
-                    BorrowRecord.status == BorrowStatus.OVERDUE,
-                )
-            )
-        ).values(
-            status=BorrowStatus.LOST,
-        ).returning(BorrowRecord)
-
-        result = await self.session.execute(query)
-        await self.session.commit()
+        result = await self.session.execute(UPDATE_BORROW_LOST, {"borrow_id": borrow_id})
         return result.scalar_one_or_none()
 
     async def mark_borrow_as_overdue(self, borrow_id: UUID) -> Optional[BorrowRecord]:
-        query = update(BorrowRecord).where(
-            and_(
-                BorrowRecord.id == borrow_id,
-                or_(
-                    BorrowRecord.status == BorrowStatus.BORROWED,
-                    BorrowRecord.due_date < datetime.now(timezone.utc),
-                )
-            )
-        ).values(
-            status=BorrowStatus.OVERDUE,
-        ).returning(BorrowRecord)
+        result = await self.session.execute(
+            UPDATE_BORROW_OVERDUE,
+            {"borrow_id": borrow_id, "now": datetime.now(timezone.utc)},
+        )
+        return result.scalar_one_or_none()
 
-        result = await self.session.execute(query)
+    async def mark_all_overdue(self) -> List[UUID]:
+        result = await self.session.execute(UPDATE_ALL_OVERDUE)
+        borrow_ids = result.scalars().all()
         await self.session.commit()
-        return result.scalar_one_or_none()
+        return borrow_ids
 
     async def create_borrow_record(self, data: BorrowRecordCreate) -> BorrowRecord:
-        new_record = BorrowRecord(**data.model_dump())
-        self.session.add(new_record)
+        try:
+            result = await self.session.execute(
+                insert(BorrowRecord).values(**data.model_dump()).returning(BorrowRecord)
+            )
+        except IntegrityError as error:
+            await self.session.rollback()
+            if getattr(error.orig, "sqlstate", None) == CHECK_VIOLATION:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Due date must be after the borrow date",
+                )
+            raise
+        return result.scalar_one()
+
+    async def commit(self) -> None:
+        # Write methods above leave the transaction open so the service can
+        # pair them with the matching book status update in one commit.
         await self.session.commit()
-        await self.session.refresh(new_record)
-        return new_record
 
     async def get_by_id(self, record_id: UUID) -> Optional[BorrowRecord]:
-        query = select(BorrowRecord).filter(BorrowRecord.id == record_id)
-        result = await self.session.execute(query)
+        result = await self.session.execute(SELECT_BORROW_BY_ID, {"borrow_id": record_id})
+        return result.scalar_one_or_none()
+
+    async def get_with_book(self, record_id: UUID) -> Optional[BorrowRecord]:
+        query = SELECT_BORROW_BY_ID.options(
+            joinedload(BorrowRecord.book, innerjoin=True)
+            .joinedload(Book.book_title, innerjoin=True)
+            .joinedload(BookTitle.category, innerjoin=True)
+        )
+        result = await self.session.execute(query, {"borrow_id": record_id})
         return result.scalar_one_or_none()
 
     async def get_all(self, params: BorrowHistoryFilter) -> List[BorrowRecord]:
-        query = select(BorrowRecord)
+        query = _with_book_title(_paginate_borrows(select(BorrowRecord), params))
         result = await self.session.execute(query)
         return result.scalars().all()
 
 
 class BookRequestRepository:
+    __slots__ = ("session",)
+
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
@@ -142,18 +299,40 @@ class BookRequestRepository:
         new_request = BookRequest(user_id=user_id, **data)
         self.session.add(new_request)
         await self.session.commit()
-        await self.session.refresh(new_request)
         return new_request
 
+    async def create_many(self, rows: List[Dict[str, Any]]) -> List[BookRequest]:
+        created: List[BookRequest] = []
+        try:
+            for start in range(0, len(rows), BOOK_REQUEST_INSERT_CHUNK_SIZE):
+                chunk = rows[start:start + BOOK_REQUEST_INSERT_CHUNK_SIZE]
+                result = await self.session.execute(
+                    insert(BookRequest).values(chunk).returning(BookRequest)
+                )
+                created.extend(result.scalars().all())
+        except IntegrityError:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="One or more requests reference an unknown user or book",
+            )
+        await self.session.commit()
+        return created
+
     async def get_all_requests(self, params: BookRequestFilter) -> List[BookRequest]:
         query = select(BookRequest)
-        if params.user_id:
-            query = query.filter(BookRequest.user_id == params.user_id)
-        if params.title_id:
-            query = query.filter(BookRequest.title_id == params.title_id)
+        if params.reader_id:
+            query = query.filter(BookRequest.user_id == params.reader_id)
+        if params.book_id:
+            query = query.filter(BookRequest.book_id == params.book_id)
         if params.status:
-            query = query.filter(BookRequest.status == BookRequestStatus(params.status))
-        result = await self.session.execute(query).limit(params.limit).offset(params.offset)
+            query = query.filter(BookRequest.status.in_(params.status))
+        query = (
+            query.order_by(desc(BookRequest.requested_at), desc(BookRequest.id))
+            .offset(params.offset)
+            .limit(params.limit)
+        )
+        result = await self.session.execute(query)
         return result.scalars().all()
 
     async def get_by_id(self, request_id: UUID) -> Optional[BookRequest]:
@@ -174,6 +353,11 @@ class BookRequestRepository:
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def exists_pending(self, book_id: UUID, user_id: UUID) -> bool:
+        return bool(
+            await self.session.scalar(SELECT_PENDING_REQUEST_EXISTS, {"book_id": book_id, "user_id": user_id})
+        )
+
     async def get_pending_request_for_title(self, title_id: UUID) -> Optional[BookRequest]:
         query = select(BookRequest).filter(
             BookRequest.title_id == title_id,
@@ -182,32 +366,22 @@ class BookRequestRepository:
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
-    async def mark_fulfilled(self, request_id: UUID) -> Optional[BookRequest]:
-        query = update(BookRequest).filter(
-            BookRequest.id == request_id,
-            BookRequest.status == BookRequestStatus.PENDING,
-        ).values(status=BookRequestStatus.FULFILLED)
-
-        result = await self.session.execute(query)
-        await self.session.commit()
+    async def _transition(self, request_id: UUID, new_status: BookRequestStatus) -> Optional[BookRequest]:
+        # Only pending requests move; None means missing or already settled.
+        # Left uncommitted like the borrow record writes; callers commit.
+        result = await self.session.execute(
+            UPDATE_PENDING_REQUEST_STATUS, {"request_id": request_id, "new_status": new_status}
+        )
         return result.scalar_one_or_none()
 
-    async def mark_rejected(self, request_id: UUID) -> Optional[BookRequest]:
-        query = update(BookRequest).filter(
-            BookRequest.id == request_id,
-            BookRequest.status == BookRequestStatus.PENDING,
-        ).values(status=BookRequestStatus.REJECTED)
+    async def mark_fulfilled(self, request_id: UUID) -> Optional[BookRequest]:
+        return await self._transition(request_id, BookRequestStatus.FULFILLED)
 
-        result = await self.session.execute(query)
-        await self.session.commit()
-        return result.scalar_one_or_none()
+    async def mark_rejected(self, request_id: UUID) -> Optional[BookRequest]:
+        return await self._transition(request_id, BookRequestStatus.REJECTED)
 
     async def mark_expired(self, request_id: UUID) -> Optional[BookRequest]:
-        query = update(BookRequest).filter(
-            BookRequest.id == request_id,
-            BookRequest.status == BookRequestStatus.PENDING,
-        ).values(status=BookRequestStatus.EXPIRED)
+        return await self._transition(request_id, BookRequestStatus.EXPIRED)
 
-        result = await self.session.execute(query)
+    async def commit(self) -> None:
         await self.session.commit()
-        return result.scalar_one_or_none()
\ No newline at end of file
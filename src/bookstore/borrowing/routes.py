@@ -1,7 +1,8 @@
 from uuid import UUID
 from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
+from fastapi.responses import StreamingResponse
 
 from bookstore.auth.models import User, UserRole
 from bookstore.auth.dependencies import get_current_active_user, user_is_librarian_or_admin
@@ -16,16 +17,41 @@ from .schemas import (
     BorrowRecordResponse,
     ReturnRequest,
     BorrowRecordDetail,
+    ReaderDashboard,
+    BORROW_LIST_ADAPTER,
 )
-from .services import BorrowService
+from .services import BorrowService, stream_borrow_history_json
 
 
 router = APIRouter()
 
 
+# List routes load each record's copy and title up front, so the response is
+# built without validation and dumped in one call, as in the books routes.
+def _borrow_to_response(record) -> BorrowRecordResponse:
+    title = record.book.book_title
+    return BorrowRecordResponse.model_construct(
+        id=record.id,
+        book_id=record.book_id,
+        user_id=record.user_id,
+        borrowed_date=record.borrowed_date,
+        due_date=record.due_date,
+        return_date=record.return_date,
+        status=record.status,
+        title=title.title,
+        author=title.author,
+        isbn=title.isbn,
+    )
+
+
+def _borrow_list_response(records) -> Response:
+    body = BORROW_LIST_ADAPTER.dump_json([_borrow_to_response(record) for record in records])
+    return Response(content=body, media_type="application/json")
+
+
 @router.post(
     "/borrow",
-    response_model=BorrowRecordResponse,
+    response_model=BorrowRecordDetail,
     status_code=status.HTTP_201_CREATED,
     summary="Borrow a book",
     tags=["borrowing"],
@@ -37,8 +63,7 @@ async def borrow(
 ):  
     borrow_data.user_id = user.id
     record = await service.borrow_book(borrow_data)
-    record_details = await service.get_borrow_details(record.id)
-    return BorrowRecordResponse(**record_details)
+    return await service.get_borrow_details(record.id, use_cache=False)
 
 
 @router.post(
@@ -54,13 +79,13 @@ async def return_book(
     service: BorrowService = Depends(get_borrow_service),
 ):
     updated_record = await service.return_book(borrow_record)
-    borrow_details = await service.get_borrow_details(updated_record.id)
+    borrow_details = await service.get_borrow_details(updated_record.id, use_cache=False)
     return borrow_details
 
 
 @router.post(
     "/mark-lost/{borrow_id}",
-    response_model=BorrowRecordResponse,
+    response_model=BorrowRecordDetail,
     status_code=status.HTTP_200_OK,
     summary="Mark a book as lost",
     tags=["borrowing"],
@@ -71,7 +96,7 @@ async def mark_borrow_as_lost(
     service: BorrowService = Depends(get_borrow_service),
 ):
     updated_record = await service.mark_borrow_as_lost(borrow_id)
-    borrow_details = await service.get_borrow_details(updated_record.id)
+    borrow_details = await service.get_borrow_details(updated_record.id, use_cache=False)
     return borrow_details
 
 
@@ -85,10 +110,8 @@ async def mark_borrow_as_lost(
 async def get_borrow_history(
     params: BorrowHistoryFilter = Query(..., description="The filter parameters for the borrows"),
     user: User = Depends(get_current_active_user),
-    service: BorrowService = Depends(get_borrow_service),
 ):
-    borrows = await service.get_reader_borrow_history(user.id, params)
-    return borrows
+    return StreamingResponse(stream_borrow_history_json(user.id, params), media_type="application/json")
 
 
 @router.get(
@@ -102,10 +125,8 @@ async def get_borrow_history_for_user(
     user_id: UUID = Path(..., description="The ID of the user"),
     params: BorrowHistoryFilter = Query(..., description="The filter parameters for the borrows"),
     user: User = Depends(user_is_librarian_or_admin),
-    service: BorrowService = Depends(get_borrow_service),
 ):
-    borrows = await service.get_borrow_history_for_user(user_id, params)
-    return borrows
+    return StreamingResponse(stream_borrow_history_json(user_id, params), media_type="application/json")
 
 
 @router.get(
@@ -120,7 +141,21 @@ async def get_active_borrows(
     service: BorrowService = Depends(get_borrow_service),
 ):
     borrows = await service.get_active_borrows_for_reader(user.id)
-    return borrows
+    return _borrow_list_response(borrows)
+
+
+@router.get(
+    "/dashboard",
+    response_model=ReaderDashboard,
+    status_code=status.HTTP_200_OK,
+    summary="Get active borrows and pending requests",
+    tags=["borrowing"],
+)
+async def get_dashboard(
+    user: User = Depends(get_current_active_user),
+    service: BorrowService = Depends(get_borrow_service),
+):
+    return await service.get_reader_dashboard(user.id)
 
 
 @router.get(
@@ -136,7 +171,7 @@ async def get_all_borrows(
     service: BorrowService = Depends(get_borrow_service),
 ):
     borrows = await service.get_all_borrows(params)
-    return borrows
+    return _borrow_list_response(borrows)
 
 
 
@@ -156,6 +191,21 @@ async def request_book(
     return request
 
 
+@router.post(
+    "/requests/bulk",
+    response_model=List[BookRequestResponse],
+    status_code=status.HTTP_201_CREATED,
+    summary="Create book requests in bulk",
+    tags=["book requests"],
+)
+async def request_books_bulk(
+    requests_data: List[BookRequestCreate],
+    user: User = Depends(user_is_librarian_or_admin),
+    service: BorrowService = Depends(get_borrow_service),
+):
+    return await service.request_books_bulk(requests_data)
+
+
 @router.get(
     "/requests/{request_id}",
     response_model=BookRequestResponse,
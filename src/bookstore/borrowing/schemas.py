@@ -2,7 +2,7 @@ from uuid import UUID
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, TypeAdapter
 
 from bookstore.books.schemas import BookDetailResponse
 
@@ -12,12 +12,9 @@ from .models import BorrowStatus, BookRequestStatus
 class BorrowRecord(BaseModel):
     book_id: UUID
     user_id: Optional[UUID] = None
-    borrowed_date: Optional[datetime] = datetime.now(timezone.utc)
+    borrowed_date: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
     due_date: Optional[datetime] = None
 
-    class Config:
-        json_encoders = {UUID: str}
-
 
 class BorrowRecordCreate(BorrowRecord):
     pass
@@ -35,21 +32,18 @@ class BorrowRecordResponse(BorrowRecord):
     author: Optional[str] = None
     isbn: Optional[str] = None
 
-    class Config:
-        from_attributes = True
-        json_encoders = {UUID: str}
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ReturnRequest(BaseModel):
     borrow_id: UUID
-    returned_date: datetime = datetime.now(timezone.utc)
-
-    class Config:
-        json_encoders = {UUID: str}
+    returned_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
 class BorrowHistoryFilter(BaseModel):
     borrow_status: Optional[List[BorrowStatus]] = None
+    after_borrowed_date: Optional[datetime] = None
+    after_id: Optional[UUID] = None
     offset: int = Field(default=0, ge=0)
     limit: int = Field(default=10, ge=1, le=100)
 
@@ -62,15 +56,14 @@ class BookRequest(BaseModel):
     book_id: UUID
     reader_id: UUID
 
-    class Config:
-        json_encoders = {UUID: str}
-
 
 class BookRequestCreate(BookRequest):
     pass
 
 
 class BookRequestResponse(BookRequest):
+    # The BookRequest model only has user_id; reader_id mirrors it.
+    reader_id: UUID = Field(validation_alias=AliasChoices("reader_id", "user_id"))
     id: UUID
     user_id: UUID
     book_id: UUID
@@ -78,9 +71,12 @@ class BookRequestResponse(BookRequest):
     requested_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-        json_encoders = {UUID: str}
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReaderDashboard(BaseModel):
+    active_borrows: List[BorrowRecordResponse]
+    pending_requests: List[BookRequestResponse]
 
 
 class BookRequestUpdate(BookRequest):
@@ -91,6 +87,8 @@ class BookRequestFilter(BaseModel):
     book_id: Optional[UUID] = None
     reader_id: Optional[UUID] = None
     status: Optional[List[BookRequestStatus]] = None
+    offset: int = Field(default=0, ge=0)
+    limit: int = Field(default=10, ge=1, le=100)
+
 
-    class Config:
-        json_encoders = {UUID: str}
\ No newline at end of file
+BORROW_LIST_ADAPTER = TypeAdapter(list[BorrowRecordResponse])
@@ -1,65 +1,114 @@
 from uuid import UUID
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import orjson
 
 from fastapi import Depends, HTTPException, Query, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from bookstore.logger import get_logger
+from bookstore.database.session import async_session_maker
 
 from bookstore.books.models import BookStatus
 from bookstore.books.repositories import BookRepository
 
 from .models import BorrowRecord, BookRequest, BorrowStatus, BookRequestStatus
 from .repositories import BorrowRecordRepository, BookRequestRepository
-from .schemas import BookRequestCreate, BorrowRecordCreate, BorrowHistoryFilter, BookRequestFilter, ReturnRequest, BorrowRecordDetail
+from .schemas import (
+    BookRequestCreate,
+    BookRequestResponse,
+    BorrowRecordCreate,
+    BorrowRecordResponse,
+    BorrowHistoryFilter,
+    BookRequestFilter,
+    ReturnRequest,
+    BorrowRecordDetail,
+    ReaderDashboard,
+)
+
+logger = get_logger("borrowing.services")
+
+BORROW_DETAILS_CACHE_TTL = 60
+
+
+def _borrow_details_key(borrow_id: UUID) -> str:
+    return f"borrow_details:{borrow_id}"
+
+
+async def invalidate_borrow_details(cache: Optional[Redis], borrow_ids: Iterable[UUID]) -> None:
+    keys = [_borrow_details_key(borrow_id) for borrow_id in borrow_ids]
+    if cache is None or not keys:
+        return
+    try:
+        await cache.delete(*keys)
+    except RedisError:
+        logger.exception("Failed to invalidate cached borrow details")
+
+
+async def stream_borrow_history_json(user_id: UUID, params: BorrowHistoryFilter) -> AsyncIterator[bytes]:
+    # Same shape as stream_users_json: its own session keeps the cursor open
+    # while the response body is being sent.
+    async with async_session_maker() as session:
+        yield b"["
+        separator = b""
+        async for borrow in BorrowRecordRepository(session).stream_reader_borrow_history(user_id, params):
+            yield separator + orjson.dumps(borrow, default=str)
+            separator = b","
+        yield b"]"
+
 
 class BorrowService:
+    __slots__ = ("borrow_record_repository", "book_request_repository", "book_repository", "cache")
+
     def __init__(
         self,
         borrow_record_repository: BorrowRecordRepository = Depends(),
         book_request_repository: BookRequestRepository = Depends(),
         book_repository: BookRepository = Depends(),
+        cache: Optional[Redis] = None,
     ):
         self.borrow_record_repository = borrow_record_repository
         self.book_request_repository = book_request_repository
         self.book_repository = book_repository
+        self.cache = cache
+
+    async def _invalidate_borrow_details(self, borrow_id: UUID) -> None:
+        await invalidate_borrow_details(self.cache, (borrow_id,))
 
     async def get_all_borrows(self, params: BorrowHistoryFilter) -> List[BorrowRecord]:
         return await self.borrow_record_repository.get_all(params)
 
     async def borrow_book(self, borrow_data: BorrowRecordCreate) -> BorrowRecord:
-        book = await self.book_repository.get_by_id(borrow_data.book_id)
-        if not book:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Book not found",
-            )
-
-        if book.status != BookStatus.AVAILABLE:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Book is not available",
-            )
-
-        active_borrow = await self.borrow_record_repository.get_active_borrow_for_book(borrow_data.book_id)
-        if active_borrow:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Book is already borrowed {active_borrow.status}",
-            )
-
         if borrow_data.due_date is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Due date cannot be empty",
             )
-        
-        if borrow_data.due_date < datetime.now(timezone.utc):
+
+        # due_date > borrowed_date is enforced by a CHECK constraint on insert.
+        book = await self.book_repository.claim_for_borrow(borrow_data.book_id)
+        if not book:
+            # Only the failure path pays for a lookup, to pick the right error.
+            row = await self.borrow_record_repository.get_book_with_active_borrow(borrow_data.book_id)
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Book not found",
+                )
+            _, active_borrow = row
+            if active_borrow:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Book is already borrowed {active_borrow.status}",
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Due date cannot be in the past",
+                detail="Book is not available",
             )
-        await self.book_repository.update_status(book_id=borrow_data.book_id, book_status=BookStatus.BORROWED)
-        borrow = await self.borrow_record_repository.create_borrow_record(borrow_data)
 
+        borrow = await self.borrow_record_repository.create_borrow_record(borrow_data)
+        await self.borrow_record_repository.commit()
         return borrow
 
     async def return_book(self, return_data: ReturnRequest) -> BorrowRecord:
@@ -77,10 +126,12 @@ class BorrowService:
             )
         await self.book_repository.update_status(book_id=borrow_record.book_id, book_status=BookStatus.AVAILABLE)
         updated_record = await self.borrow_record_repository.mark_borrow_as_returned(return_data)
+        await self.borrow_record_repository.commit()
+        await self._invalidate_borrow_details(return_data.borrow_id)
         return updated_record
 
     async def mark_borrow_as_lost(self, borrow_id: UUID) -> BorrowRecord:
-        borrow_record = self.borrow_record_repository.get_by_id(borrow_id)
+        borrow_record = await self.borrow_record_repository.get_by_id(borrow_id)
         if not borrow_record:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -94,6 +145,8 @@ class BorrowService:
             )
         await self.book_repository.update_status(book_id=borrow_record.book_id, book_status=BookStatus.LOST)
         updated_record = await self.borrow_record_repository.mark_borrow_as_lost(borrow_id)
+        await self.borrow_record_repository.commit()
+        await self._invalidate_borrow_details(borrow_id)
         return updated_record
 
     async def get_reader_borrow_history(
@@ -109,43 +162,66 @@ class BorrowService:
     async def get_overdue_borrows_for_reader(self, reader_id: UUID) -> List[BorrowRecord]:
         return await self.borrow_record_repository.get_overdue_borrows_for_reader(reader_id)
 
-    async def get_borrow_details(self, borrow_id: UUID) -> BorrowRecordDetail:
-        record = await self.borrow_record_repository.get_by_id(borrow_id)
+    async def get_reader_dashboard(self, reader_id: UUID) -> ReaderDashboard:
+        active_borrows = []
+        pending_requests = []
+        for row in await self.borrow_record_repository.get_reader_dashboard(reader_id):
+            if row.source == "borrow":
+                active_borrows.append(BorrowRecordResponse.model_construct(
+                    id=row.id,
+                    book_id=row.book_id,
+                    user_id=row.user_id,
+                    borrowed_date=row.started_at,
+                    due_date=row.due_date,
+                    return_date=row.return_date,
+                    status=BorrowStatus[row.status],
+                ))
+            else:
+                pending_requests.append(BookRequestResponse.model_construct(
+                    id=row.id,
+                    book_id=row.book_id,
+                    user_id=row.user_id,
+                    reader_id=row.user_id,
+                    status=BookRequestStatus[row.status],
+                    requested_at=row.started_at,
+                    updated_at=row.updated_at,
+                ))
+        return ReaderDashboard.model_construct(active_borrows=active_borrows, pending_requests=pending_requests)
+
+    async def get_borrow_details(self, borrow_id: UUID, use_cache: bool = True) -> BorrowRecordDetail:
+        # Redis is a best-effort layer: any error falls through to the database.
+        # Callers that have just written the record pass use_cache=False so the
+        # response neither comes from nor re-populates the cache.
+        cache_key = _borrow_details_key(borrow_id)
+        use_cache = use_cache and self.cache is not None
+        if use_cache:
+            try:
+                cached = await self.cache.get(cache_key)
+            except RedisError:
+                logger.exception("Failed to read cached borrow details")
+                cached = None
+            if cached is not None:
+                return BorrowRecordDetail.model_validate_json(cached)
+
+        # The record, its copy, the copy's title and category come back in one
+        # joined query; the foreign keys guarantee the copy exists.
+        record = await self.borrow_record_repository.get_with_book(borrow_id)
         if not record:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Borrow not found",
             )
-        
-        book = await self.book_repository.get_by_id(record.book_id)
-        if not book:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Book not found",
-            )
-        
-        # book_details = await self.cache.get(f"book:{book.id}")
-        # if not book_details:
-        #     self.cache.set(
-        #         f"book:{book.id}",
-        #         {
-        #             "title": book.book_title,
-        #             "author": book.book_title.author,
-        #             "genre": book.book_title.category,
-        #             "description": book.book_title.description,
-        #             "barcode": book.barcode,
-        #         }
-        #     )
-
-        book_details = {
-                "title": book.book_title.title,
-                "author": book.book_title.author,
-                "category": book.book_title.category,
-                "description": book.book_title.description,
-                "barcode": book.barcode,
-            }
-        
-        return BorrowRecordDetail(borrow_record=record, book_details=book_details)
+
+        details = BorrowRecordDetail.model_validate(
+            {"borrow_record": record, "book_details": record.book},
+            from_attributes=True,
+        )
+        if use_cache:
+            try:
+                await self.cache.set(cache_key, details.model_dump_json(), ex=BORROW_DETAILS_CACHE_TTL)
+            except RedisError:
+                logger.exception("Failed to cache borrow details")
+        return details
 
     async def request_book(self, request_data: BookRequestCreate) -> BookRequest:
         book = await self.book_repository.get_by_id(request_data.book_id)
@@ -161,8 +237,7 @@ class BorrowService:
                 detail="Book is already available",
             )
         
-        pending_requests = await self.book_request_repository.get_pending_requests_for_book(request_data.book_id)
-        if any(req.reader_id == request_data.reader_id for req in pending_requests):
+        if await self.book_request_repository.exists_pending(request_data.book_id, request_data.reader_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="You have already requested to borrow this book",
@@ -170,59 +245,41 @@ class BorrowService:
         
         return await self.book_request_repository.create_book_request(request_data.reader_id, request_data.book_id)
 
+    async def request_books_bulk(self, requests: List[BookRequestCreate]) -> List[BookRequest]:
+        if not requests:
+            return []
+        rows = [{"user_id": request.reader_id, "book_id": request.book_id} for request in requests]
+        return await self.book_request_repository.create_many(rows)
+
     async def get_pending_requests(self, user_id: UUID) -> List[BookRequest]:
         return await self.book_request_repository.get_pending_requests_for_user(user_id)
 
-    async def accept_request(self, request_id: UUID) -> BookRequest:
-        request = await self.book_request_repository.get_by_id(request_id)
+    async def _settle_request(self, request: Optional[BookRequest], request_id: UUID) -> BookRequest:
         if not request:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Request not found",
-            )
-        
-        if request.status != BookRequestStatus.PENDING:
+            # The conditional UPDATE matched nothing; look up why.
+            if not await self.book_request_repository.get_by_id(request_id):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Request not found",
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Request is not pending",
             )
-        
-        await self.book_request_repository.mark_fulfilled(request_id)
+        await self.book_request_repository.commit()
         return request
 
+    async def accept_request(self, request_id: UUID) -> BookRequest:
+        request = await self.book_request_repository.mark_fulfilled(request_id)
+        return await self._settle_request(request, request_id)
+
     async def reject_request(self, request_id: UUID) -> BookRequest:
-        request = await self.book_request_repository.get_by_id(request_id)
-        if not request:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Request not found",
-            )
-        
-        if request.status != BookRequestStatus.PENDING:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Request is not pending",
-            )
-        
-        await self.book_request_repository.mark_rejected(request_id)
-        return request
+        request = await self.book_request_repository.mark_rejected(request_id)
+        return await self._settle_request(request, request_id)
 
     async def mark_expired(self, request_id: UUID) -> BookRequest:
-        request = await self.book_request_repository.get_by_id(request_id)
-        if not request:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Request not found",
-            )
-        
-        if request.status != BookRequestStatus.PENDING:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Request is not pending",
-            )
-        
-        await self.book_request_repository.mark_expired(request_id)
-        return request
+        request = await self.book_request_repository.mark_expired(request_id)
+        return await self._settle_request(request, request_id)
 
     async def get_all_requests(self, search_params: BookRequestFilter) -> List[BookRequest]:
         return await self.book_request_repository.get_all_requests(search_params)
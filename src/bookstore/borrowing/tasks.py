@@ -0,0 +1,54 @@
+import asyncio
+
+from typing import Optional
+
+from bookstore.logger import get_logger
+from bookstore.database.redis import redis_client
+from bookstore.database.session import async_session_maker
+
+from .repositories import BorrowRecordRepository
+from .services import invalidate_borrow_details
+
+
+logger = get_logger("borrowing.tasks")
+
+
+class OverdueSweeper:
+    """Periodically flags every borrow that is past its due date.
+
+    Each sweep is a single set-based UPDATE and one commit, however many
+    records fall overdue in between.
+    """
+
+    def __init__(self, interval: float = 3600.0) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def sweep(self) -> int:
+        async with async_session_maker() as session:
+            borrow_ids = await BorrowRecordRepository(session).mark_all_overdue()
+        await invalidate_borrow_details(redis_client, borrow_ids)
+        count = len(borrow_ids)
+        if count:
+            logger.info("Marked borrows as overdue", count=count)
+        return count
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Failed to mark overdue borrows")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+overdue_sweeper = OverdueSweeper()
@@ -2,88 +2,114 @@ import secrets
 
 from functools import lru_cache
 from typing import List
+from urllib.parse import quote
 
-from pydantic import AnyHttpUrl, PostgresDsn, RedisDsn, SecretStr, model_validator
+from dotenv import load_dotenv
+from pydantic import AnyHttpUrl, SecretStr, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+# Read .env into the environment once for all settings classes below, rather
+# than each of them parsing the file again. Real environment variables win.
+load_dotenv(".env", encoding="utf-8", override=False)
+
+SETTINGS_CONFIG = SettingsConfigDict(
+    case_sensitive=False,
+    extra="ignore",
+    frozen=True,
+)
+
+
+def _raw_setting(settings_cls, values: dict, name: str):
+    # "before" validators see only what the sources supplied, so fall back
+    # to the field default and unwrap secrets for URL building.
+    value = values.get(name, settings_cls.model_fields[name].default)
+    return value.get_secret_value() if isinstance(value, SecretStr) else value
+
+
 class DatabaseConfig(BaseSettings):
-    model_config = SettingsConfigDict(
-        case_sensitive=False,
-        env_file=".env",
-        env_file_encoding="utf-8",
-        extra="ignore",
-    )
+    model_config = SETTINGS_CONFIG
 
     DATABASE_HOST: str = "localhost"
     DATABASE_USER: str = "postgres"
     DATABASE_PASSWORD: SecretStr = SecretStr("postgres")
     DATABASE_NAME: str = "postgres"
     DATABASE_PORT: int = 5432
-    DATABASE_URI: PostgresDsn | None = None
+    DATABASE_URI: str | None = None
+
+    DATABASE_POOL_SIZE: int = 20
+    DATABASE_MAX_OVERFLOW: int = 40
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_TIMEOUT: int = 30
+    DATABASE_BEHIND_PGBOUNCER: bool = False
 
     @model_validator(mode="before")
-    def parse_db_uri(cls, values) -> "DatabaseConfig":
-        values["DATABASE_URI"] = PostgresDsn.build(
-            scheme="postgresql+asyncpg",
-            username=values["DATABASE_USER"],
-            password=values["DATABASE_PASSWORD"],
-            host=values["DATABASE_HOST"],
-            path=values["DATABASE_NAME"],
-            port=int(values["DATABASE_PORT"]),
-        )
+    @classmethod
+    def parse_db_uri(cls, values: dict) -> dict:
+        user = quote(_raw_setting(cls, values, "DATABASE_USER"), safe="")
+        password = quote(_raw_setting(cls, values, "DATABASE_PASSWORD"), safe="")
+        host = _raw_setting(cls, values, "DATABASE_HOST")
+        port = int(_raw_setting(cls, values, "DATABASE_PORT"))
+        name = _raw_setting(cls, values, "DATABASE_NAME")
+        # Plain string: the engine only ever needs str(), so skip the DSN type.
+        values["DATABASE_URI"] = f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{name}"
         return values
 
 
 class RedisConfig(BaseSettings):
-    model_config = SettingsConfigDict(
-        case_sensitive=False,
-        env_file=".env",
-        env_file_encoding="utf-8",
-        extra="ignore",
-    )
+    model_config = SETTINGS_CONFIG
 
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: SecretStr = SecretStr("redis")
-    REDIS_URI: RedisDsn | None = None
+    REDIS_URI: str | None = None
 
     @model_validator(mode="before")
-    def parse_redis_uri(cls, values) -> "RedisConfig":
-        values["REDIS_URI"] = RedisDsn.build(
-            scheme="redis",
-            host=values["REDIS_HOST"],
-            port=int(values["REDIS_PORT"]),
-            password=values["REDIS_PASSWORD"],
-        )
+    @classmethod
+    def parse_redis_uri(cls, values: dict) -> dict:
+        password = quote(_raw_setting(cls, values, "REDIS_PASSWORD"), safe="")
+        host = _raw_setting(cls, values, "REDIS_HOST")
+        port = int(_raw_setting(cls, values, "REDIS_PORT"))
+        values["REDIS_URI"] = f"redis://:{password}@{host}:{port}"
         return values
 
 
 class AuthConfig(BaseSettings):
-    model_config = SettingsConfigDict(
-        case_sensitive=False,
-        env_file=".env",
-        env_file_encoding="utf-8",
-        extra="ignore",
-    )
+    model_config = SETTINGS_CONFIG
 
     JWT_SECRET_KEY: SecretStr = SecretStr(secrets.token_urlsafe(32))
+    JWT_PUBLIC_KEY: str | None = None
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # API keys are stored as HMACs under this pepper, so it must be the same
+    # across restarts and workers; only DEBUG falls back to a random one.
+    API_KEY_PEPPER: SecretStr
+
+    PASSWORD_HASH_TIME_COST: int = 3
+    PASSWORD_HASH_MEMORY_COST: int = 65536
+    PASSWORD_HASH_PARALLELISM: int = 4
+
+    @model_validator(mode="before")
+    @classmethod
+    def require_api_key_pepper(cls, values: dict) -> dict:
+        if not values.get("API_KEY_PEPPER"):
+            if not get_config().DEBUG:
+                raise ValueError("API_KEY_PEPPER must be set unless DEBUG is enabled")
+            values["API_KEY_PEPPER"] = secrets.token_urlsafe(32)
+        return values
+
 
 class Config(BaseSettings):
 
-    model_config = SettingsConfigDict(
-        case_sensitive=False,
-        env_file=".env",
-        env_file_encoding="utf-8",
-        extra="ignore",
-    )
+    model_config = SETTINGS_CONFIG
 
     PROJECT_NAME: str = "Bookstore"
     API_V1_STR: str = "/api/v1"
     DEBUG: bool = False
+    # Share of successful requests whose access log lines are written;
+    # 4xx/5xx responses and failures are always logged.
+    LOG_SAMPLE_RATE: float = 0.01
 
     ADMIN_EMAIL: str = "admin@bookstore.com"
     ADMIN_PASSWORD: SecretStr = SecretStr("password123")
@@ -94,10 +120,35 @@ class Config(BaseSettings):
     RATE_LIMITER_MAX_REQUESTS: int = 100
     RATE_LIMITER_TIMEFRAME: int = 60
 
-    auth: AuthConfig = AuthConfig()
-    database: DatabaseConfig = DatabaseConfig()
-    redis: RedisConfig = RedisConfig()
-    
+    # Sub-configs are read from the environment on first use and then shared,
+    # rather than being built as field defaults when this module is imported.
+    @property
+    def auth(self) -> AuthConfig:
+        return get_auth_config()
+
+    @property
+    def database(self) -> DatabaseConfig:
+        return get_database_config()
+
+    @property
+    def redis(self) -> RedisConfig:
+        return get_redis_config()
+
+
+@lru_cache
+def get_auth_config() -> AuthConfig:
+    return AuthConfig()
+
+
+@lru_cache
+def get_database_config() -> DatabaseConfig:
+    return DatabaseConfig()
+
+
+@lru_cache
+def get_redis_config() -> RedisConfig:
+    return RedisConfig()
+
 
 @lru_cache
 def get_config() -> Config:
@@ -0,0 +1,42 @@
+"""store api key hash as hmac digest
+
+Revision ID: 7c2e9d41a8b3
+Revises: 30d0babd2885
+Create Date: 2025-03-24 10:12:37.418206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9d41a8b3'
+down_revision: Union[str, None] = '30d0babd2885'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing hashes cannot be converted to HMAC digests without the raw keys,
+    # so they are replaced with a unique placeholder digest and must be reissued.
+    op.alter_column(
+        'api_keys',
+        'api_key_hash',
+        existing_type=sa.String(),
+        type_=sa.LargeBinary(length=32),
+        existing_nullable=False,
+        postgresql_using="sha256(convert_to(api_key_hash, 'UTF8'))",
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'api_keys',
+        'api_key_hash',
+        existing_type=sa.LargeBinary(length=32),
+        type_=sa.String(),
+        existing_nullable=False,
+        postgresql_using="encode(api_key_hash, 'hex')",
+    )
@@ -16,6 +16,9 @@ naming_convention = {
 
 class Base(DeclarativeBase):
     metadata = MetaData(naming_convention=naming_convention)
+    # Server-generated ids and timestamps come back in the INSERT's RETURNING
+    # clause instead of a follow-up SELECT.
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class TimeStampMixin:
@@ -37,5 +40,4 @@ class UUIDMixin:
         UUID(as_uuid=True),
         primary_key=True,
         server_default=func.gen_random_uuid(),
-        default=uuid.uuid4
     )
\ No newline at end of file
@@ -0,0 +1,19 @@
+from typing import Final
+
+from redis.asyncio import Redis
+
+from bookstore.config import config
+
+
+redis_client: Final[Redis] = Redis(
+    host=config.redis.REDIS_HOST,
+    port=config.redis.REDIS_PORT,
+    password=config.redis.REDIS_PASSWORD.get_secret_value(),
+    # Redis only fronts the database here, so give up quickly and fall back.
+    socket_connect_timeout=1,
+    socket_timeout=1,
+)
+
+
+async def get_redis() -> Redis:
+    return redis_client
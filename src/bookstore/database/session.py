@@ -1,20 +1,46 @@
 from typing import Final, Annotated, AsyncGenerator
+from uuid import uuid4
 
 from fastapi import Depends
-from sqlalchemy import create_engine, NullPool
-from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from bookstore.config import config
 
 
-SQLALCHEMY_DATABASE_URL = str(config.database.DATABASE_URI)
+SQLALCHEMY_DATABASE_URL = config.database.DATABASE_URI
 
-engine: Final[AsyncEngine] = AsyncEngine(create_engine(
+if config.database.DATABASE_BEHIND_PGBOUNCER:
+    # PgBouncer already pools server connections, and in transaction mode
+    # a connection may change between statements. Skip the local pool, turn
+    # off both prepared statement caches (SQLAlchemy's and asyncpg's), and
+    # give every prepared statement a unique name so that names left behind
+    # on a server connection can't clash with another client's.
+    engine_options = {
+        "poolclass": NullPool,
+        "connect_args": {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        },
+    }
+else:
+    engine_options = {
+        "pool_size": config.database.DATABASE_POOL_SIZE,
+        "max_overflow": config.database.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": config.database.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": config.database.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": True,
+        "connect_args": {"prepared_statement_cache_size": 500},
+    }
+
+engine: Final[AsyncEngine] = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
-    echo=True,
-    poolclass=NullPool,
-    future=True,
-))
+    echo=config.DEBUG,
+    echo_pool=False,
+    query_cache_size=1024,
+    **engine_options,
+)
 
 async_session_maker: Final[async_sessionmaker[AsyncSession]] = async_sessionmaker(
     bind=engine,
@@ -24,6 +50,8 @@ async_session_maker: Final[async_sessionmaker[AsyncSession]] = async_sessionmake
 )
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    # FastAPI caches this dependency per request, so every repository built
+    # for a request shares one session and holds at most one pooled connection.
     async with async_session_maker() as session:
         try:
             yield session
@@ -1,18 +1,37 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from bookstore.auth.routes import router as auth_router
 from bookstore.books.routes import router as book_router
 from bookstore.borrowing.routes import router as borrow_router
+from bookstore.auth.tasks import last_used_batcher
+from bookstore.borrowing.tasks import overdue_sweeper
+from bookstore.database.redis import redis_client
 
 from .middleware import LoggingMiddleware
 from .config import config
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    last_used_batcher.start()
+    overdue_sweeper.start()
+    yield
+    await overdue_sweeper.stop()
+    await last_used_batcher.stop()
+    await redis_client.aclose()
+
+
 app = FastAPI(
     title=config.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{config.API_V1_STR}/openapi.json",
     docs_url=f"{config.API_V1_STR}/docs",
     redoc_url=f"{config.API_V1_STR}/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -25,9 +44,14 @@ app.add_middleware(
 
 app.add_middleware(LoggingMiddleware)
 
-app.include_router(auth_router, prefix=f"{config.API_V1_STR}/auth")
-app.include_router(book_router, prefix=f"{config.API_V1_STR}/books")
-app.include_router(borrow_router, prefix=f"{config.API_V1_STR}/borrowing")
+ROUTERS = (
+    (auth_router, "/auth"),
+    (book_router, "/books"),
+    (borrow_router, "/borrowing"),
+)
+
+for router, prefix in ROUTERS:
+    app.include_router(router, prefix=f"{config.API_V1_STR}{prefix}")
 
 @app.get("/")
 async def root():
@@ -1,5 +1,6 @@
+import random
+import secrets
 import time
-import uuid
 from typing import Callable
 
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -7,43 +8,58 @@ from starlette.requests import Request
 from starlette.responses import Response
 from structlog import get_logger
 
+from .config import config
+
+logger = get_logger("api.request")
+
+
+def _client_ip(request: Request) -> str | None:
+    # For log lines only: the first X-Forwarded-For hop when behind a proxy,
+    # otherwise the peer address straight from the ASGI scope.
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if forwarded_for:
+        return forwarded_for.split(",", 1)[0].strip()
+    client = request.scope.get("client")
+    return client[0] if client else None
+
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        logger = get_logger("api.request")
-        request_id = str(uuid.uuid4())
-
-        logger.info(
-            "Request started",
-            method=request.method,
-            path=request.url.path,
-            query_params=request.query_params,
-            request_id=request_id,
-            client_ip=request.client.host,
-        )
-
-        start_time = time.time()
-        try:
-            response: Response = await call_next(request)
-            duration = time.time() - start_time
+        # Only used to correlate log lines, so 64 random bits are plenty.
+        request_id = secrets.token_hex(8)
+        request_logger = logger.bind(request_id=request_id)
+        sampled = random.random() < config.LOG_SAMPLE_RATE
 
-            logger.info(
-                "Request completed",
+        if sampled:
+            request_logger.info(
+                "Request started",
                 method=request.method,
                 path=request.url.path,
-                status_code=response.status_code,
-                request_id=request_id,
-                duration=duration,
+                query_params=request.query_params,
+                client_ip=_client_ip(request),
             )
+
+        start_time = time.perf_counter()
+        try:
+            response: Response = await call_next(request)
+            duration = time.perf_counter() - start_time
+
+            if sampled or response.status_code >= 400:
+                request_logger.info(
+                    "Request completed",
+                    method=request.method,
+                    path=request.url.path,
+                    status_code=response.status_code,
+                    duration=duration,
+                )
             return response
 
         except Exception as e:
-            duration = time.time() - start_time
-            logger.exception(
+            duration = time.perf_counter() - start_time
+            request_logger.exception(
                 "Request failed",
                 method=request.method,
                 path=request.url.path,
-                request_id=request_id,
                 duration=duration,
                 exception=str(e),
             )
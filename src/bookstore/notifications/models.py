@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import func, ForeignKey
+from sqlalchemy import func, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import String, TIMESTAMP
 
@@ -15,12 +15,19 @@ if TYPE_CHECKING:
 
 class Notification(Base, TimeStampMixin, UUIDMixin):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index(
+            "ix_notifications_user_unread",
+            "user_id",
+            postgresql_where="read_at IS NULL",
+        ),
+    )
 
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), index=True, nullable=False)
     message: Mapped[str] = mapped_column(String, nullable=False)
-    sent_at: Mapped[Optional[datetime]] = mapped_column(
+    sent_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
-        onupdate=func.now(),
+        server_default=func.now(),
         nullable=False,
     )
     read_at: Mapped[Optional[datetime]] = mapped_column(
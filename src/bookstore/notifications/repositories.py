@@ -1,13 +1,32 @@
 from uuid import UUID
 from typing import List
-from datetime import datetime, timezone
 
-from sqlalchemy import select, update, and_
+from sqlalchemy import bindparam, func, select, update, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .models import Notification
 
 
+# read_at is stamped by the database, so both statements compile to fixed
+# SQL that the engine's prepared statement cache can reuse.
+UPDATE_NOTIFICATION_READ = update(Notification).where(
+    and_(
+        Notification.id == bindparam("notification_id"),
+        Notification.read_at.is_(None),
+    )
+).values(
+    read_at=func.now(),
+).returning(Notification)
+UPDATE_ALL_NOTIFICATIONS_READ = update(Notification).where(
+    and_(
+        Notification.user_id == bindparam("user_id"),
+        Notification.read_at.is_(None),
+    )
+).values(
+    read_at=func.now(),
+).execution_options(synchronize_session=False)
+
+
 class NotificationRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -19,7 +38,6 @@ class NotificationRepository:
         )
         self.session.add(notification)
         await self.session.commit()
-        await self.session.refresh(notification)
         return notification
 
     async def get_user_notifications(
@@ -36,30 +54,14 @@ class NotificationRepository:
 
         query = query.offset(offset).limit(limit)
         result = await self.session.execute(query)
-        return result.scalars()._allrows()
+        return result.scalars().all()
 
     async def mark_as_read(self, notification_id: UUID) -> Notification:
-        query = update(Notification).where(
-            and_(
-                Notification.id == notification_id,
-                Notification.read_at.is_(None),
-            )
-        ).values(
-            read_at=datetime.now(timezone.utc),
-        ).returning(Notification)
-
-        result = await self.session.execute(query)
+        result = await self.session.execute(UPDATE_NOTIFICATION_READ, {"notification_id": notification_id})
         await self.session.commit()
         return result.scalar_one_or_none()
 
     async def mark_all_as_read(self, user_id: UUID) -> int:
-        query = update(Notification).where(
-            and_(
-                Notification.user_id == user_id,
-                Notification.read_at.is_(None),
-            )
-        ).values(read_at=datetime.now(timezone.utc))
-
-        result = await self.session.execute(query)
+        result = await self.session.execute(UPDATE_ALL_NOTIFICATIONS_READ, {"user_id": user_id})
         await self.session.commit()
-        return result.rowcount
\ No newline at end of file
+        return result.rowcount
@@ -15,7 +15,7 @@ if TYPE_CHECKING:
 class Librarian(Base, UUIDMixin, TimeStampMixin):
     __tablename__ = "librarians"
 
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), index=True, nullable=False)
     division: Mapped[str] = mapped_column(String, nullable=False)
     
     user: Mapped["User"] = relationship(back_populates="librarians")
@@ -24,7 +24,7 @@ class Librarian(Base, UUIDMixin, TimeStampMixin):
 class Reader(Base, UUIDMixin, TimeStampMixin):
     __tablename__ = "readers"
 
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), index=True, nullable=False)
     reader_badge: Mapped[str] = mapped_column(String, nullable=False)
 
     user: Mapped["User"] = relationship(back_populates="readers")
@@ -1,11 +1,27 @@
 from uuid import UUID
 
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import query
+
+from bookstore.auth.models import User
 
 from .models import Reader, Librarian
 
 
+SELECT_READER_BY_EMAIL = (
+    select(Reader)
+    .join(User, Reader.user_id == User.id)
+    .where(User.email == bindparam("email"))
+    .limit(1)
+)
+SELECT_LIBRARIAN_BY_EMAIL = (
+    select(Librarian)
+    .join(User, Librarian.user_id == User.id)
+    .where(User.email == bindparam("email"))
+    .limit(1)
+)
+
+
 class UserRepository:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
@@ -17,9 +33,7 @@ class UserRepository:
         return await self.session.get(Librarian, librarian_id)
 
     async def get_reader_by_email(self, email: str) -> Reader | None:
-        return await self.session.query(Reader).filter(Reader.user.email == email).first()
+        return await self.session.scalar(SELECT_READER_BY_EMAIL, {"email": email})
 
     async def get_librarian_by_email(self, email: str) -> Librarian | None:
-        return await self.session.query(Librarian).filter(Librarian.user.email == email).first()
-
-    
\ No newline at end of file
+        return await self.session.scalar(SELECT_LIBRARIAN_BY_EMAIL, {"email": email})
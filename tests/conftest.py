@@ -0,0 +1,4 @@
+import os
+
+# The settings refuse to load without a pepper outside DEBUG.
+os.environ.setdefault("API_KEY_PEPPER", "test-pepper")
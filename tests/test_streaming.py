@@ -0,0 +1,77 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import orjson
+from asyncpg.pgproto.pgproto import UUID as PgUUID
+
+from bookstore.auth import services as auth_services
+from bookstore.auth.models import UserRole
+from bookstore.borrowing import services as borrowing_services
+from bookstore.borrowing.models import BorrowStatus
+from bookstore.borrowing.schemas import BorrowHistoryFilter
+
+
+@asynccontextmanager
+async def _fake_session_maker():
+    yield None
+
+
+async def _collect(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+def test_stream_users_json_serializes_asyncpg_uuids(monkeypatch):
+    now = datetime.now(timezone.utc)
+    user_id = "12345678-1234-5678-1234-567812345678"
+
+    async def stream_all_users(self, skip, limit):
+        for _ in range(2):
+            yield {
+                "id": PgUUID(user_id),
+                "email": "reader@example.com",
+                "role": UserRole.READER,
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now,
+            }
+
+    monkeypatch.setattr(auth_services, "async_session_maker", _fake_session_maker)
+    monkeypatch.setattr(auth_services.UserRepository, "stream_all_users", stream_all_users)
+
+    body = orjson.loads(asyncio.run(_collect(auth_services.stream_users_json())))
+
+    assert [user["id"] for user in body] == [user_id, user_id]
+    assert body[0]["role"] == UserRole.READER.value
+
+
+def test_stream_borrow_history_json_serializes_asyncpg_uuids(monkeypatch):
+    now = datetime.now(timezone.utc)
+    borrow_id = "87654321-4321-8765-4321-876543218765"
+
+    async def stream_reader_borrow_history(self, user_id, params):
+        yield {
+            "id": PgUUID(borrow_id),
+            "book_id": PgUUID(borrow_id),
+            "user_id": PgUUID(borrow_id),
+            "borrowed_date": now,
+            "due_date": now,
+            "return_date": None,
+            "status": BorrowStatus.BORROWED,
+            "title": "Dune",
+            "author": "Frank Herbert",
+            "isbn": "9780441013593",
+        }
+
+    monkeypatch.setattr(borrowing_services, "async_session_maker", _fake_session_maker)
+    monkeypatch.setattr(
+        borrowing_services.BorrowRecordRepository,
+        "stream_reader_borrow_history",
+        stream_reader_borrow_history,
+    )
+
+    stream = borrowing_services.stream_borrow_history_json(PgUUID(borrow_id), BorrowHistoryFilter())
+    body = orjson.loads(asyncio.run(_collect(stream)))
+
+    assert body[0]["id"] == borrow_id
+    assert body[0]["status"] == BorrowStatus.BORROWED.value